@@ -1,454 +1,2170 @@
 #!/usr/bin/env python3
 
+import os
+import copy
+import json
+import pickle
+import heapq
+import bisect
+import random
+import statistics
 import requests
+import sqlite3
 import time
 import threading
-from collections import defaultdict, Counter
-from sklearn.ensemble import GradientBoostingClassifier
-from flask import Flask, render_template_string, jsonify
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from flask import Flask, render_template_string, jsonify, request, Response, abort
 
 # =====================================================
 # CONFIG
 # =====================================================
 
 API_URL = "https://wingo1min.onrender.com/api/get_history"
+
+# Feeds tracked by one process: name -> history endpoint. Each gets its
+# own history, models, Jarvis and stats; the first is what "/" shows.
+FEEDS = {
+    "1min": API_URL,
+}
+DEFAULT_FEED = next(iter(FEEDS))
+FEED_WORKERS = 4     # threads shared by every feed's poll steps
+TRAIN_WORKERS = 2    # threads shared by every feed's retrains
+HTTP_POOL = 16       # pooled connections per API host, shared by all feeds
 HISTORY_LIMIT = 2000
 TRAIN_SIZE = 500
 BASE_CONF = 0.52   # BALANCED
+CONF_STEP = 0.04   # added per loss in a row, up to two
+RETRAIN_EVERY = 5
+
+AI_WEIGHT = 1.4
+AI_WEIGHT_MIN = 0.9
+AI_WEIGHT_MAX = 1.8
+AI_WEIGHT_STEP = 0.01
+
+GB_ESTIMATORS = 120
+GB_LEARNING_RATE = 0.05
+GB_MAX_DEPTH = 4
+GB_GROW_TREES = 10    # trees boosted onto the live model per retrain (0: always refit)
+GB_MAX_TREES = 240    # past this a retrain starts over from GB_ESTIMATORS trees
+
+MARKOV_ORDER = 3
+MARKOV_MIN_OBS = 4
+
+PATTERN_DEPTHS = (6, 5, 4, 3)
+PATTERN_MIN_MATCHES = 3
+
+# The models that vote on each issue are registered in VOTERS (ENSEMBLE)
+VOTE_BUDGET = 0.05    # seconds a decision waits on voters run off-thread
+VOTE_INLINE = 0.002   # voters averaging less than this run inline
+VOTE_WORKERS = 8      # shared by every feed's off-thread voters
+
+# (window, same-number run length, max count of one number) -- skip the
+# next draw when any window holds such a run or a number seen more often
+ANOMALY_RULES = [(20, 3, 6)]
+
+SYNC_PAGES = 19
+SYNC_PAGE_SIZE = 50
+SYNC_WORKERS = 6
+SYNC_MIN = 100       # draws the models need before the feed can start
+SYNC_RETRIES = 2     # extra tries for a page before the whole sync fails
+
+HISTORY_DB = "history.db"
+MODEL_PATH = "model.pkl"   # last fitted AiCore, reloaded at startup
+EVENT_LOG = "events.log"   # every decision and resolution, fixed-width records
+EVENT_CHUNK = 1 << 16      # records the log file grows by at a time
+
+# Poll loop: sleep until just before the next expected result, then poll
+# every POLL_FAST seconds until it shows up. The period is learned from
+# how often issueNumber changes.
+POLL_PERIOD = 60     # starting guess, seconds per issue
+POLL_LEAD = 2        # seconds before the expected result to start polling
+POLL_FAST = 0.5
+POLL_IDLE = 1        # until the first issue change has been timed
+BACKOFF_BASE = 1     # failed polls back off 1, 2, 4 ... seconds (jittered)
+BACKOFF_MAX = 30
+
+BACKFILL_MAX = 200   # longer gaps fall back to a full resync
+
+SSE_KEEPALIVE = 15   # seconds between comment frames on idle event streams
+
+HISTORY_ROWS = 1000  # resolved predictions kept in memory for /api/history
+HISTORY_PAGE = 50
+
+# Multi-process (gunicorn) deployment: one leader runs the pollers and
+# publishes through each feed's history db, every other worker only reads it
+LEADER_LOCK = "leader.lock"
+LEADER_RETRY = 5     # seconds between follower attempts to take over
+SHARED_POLL = 0.25   # seconds between a follower's checks for a new version
+METRICS_EXPORT = 5   # seconds between the leader's metrics dumps for followers
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# =====================================================
+# GLOBAL STATE FOR UI
+# =====================================================
+
+def new_state():
+    return {
+        "current_period": "WAITING",
+        "current_prediction": "ANALYZING...",
+        "wins": 0,
+        "losses": 0,
+        "current_win_streak": 0,
+        "current_loss_streak": 0,
+        "max_win_streak": 0,
+        "max_loss_streak": 0,
+        "status": "INITIALIZING AI...",
+        "model_version": 0,
+        "anomaly": None,
+        "last_train_ms": 0,
+        # Resolved predictions live in Publisher.rows / the store;
+        # the dashboard shows rows with seq >= history_from
+        "history_seq": 0,
+        "history_from": 1,
+        # Seconds after process start each startup step finished; ready once
+        # history and models are in, live once the feed has been polled
+        "ready": False,
+        "startup": {"history": None, "models": None, "live": None}
+    }
+
+APP_STATE = new_state()
+
+STARTED = time.monotonic()
+STARTUP = {"boot": None, "sklearn": None}   # process-wide steps, as above
+
+def mark(steps, name):
+    steps[name] = round(time.monotonic() - STARTED, 3)
+
+def reset_stats(state=APP_STATE):
+    state["wins"] = 0
+    state["losses"] = 0
+    state["current_win_streak"] = 0
+    state["current_loss_streak"] = 0
+    state["max_win_streak"] = 0
+    state["max_loss_streak"] = 0
+    state["history_from"] = state["history_seq"] + 1
+    state["status"] = "STATS RESET AFTER 20 WINS"
+
+# =====================================================
+# STATE PUBLISHER (VERSIONED, PUSHED TO DASHBOARDS)
+# =====================================================
+
+def encode_state(state):
+    return json.dumps(state, separators=(",", ":")).encode()
+
+def freeze_state(state):
+    # Values are scalars or flat dicts (startup), so one level of copying
+    # is enough to detach a snapshot from the working state
+    return {k: dict(v) if isinstance(v, dict) else v for k, v in state.items()}
+
+class Publisher:
+
+    # Writers change the working `state` while holding `lock` and then
+    # publish(), which freezes it into `current`: a (version, state, body)
+    # tuple that is never modified again, swapped in as one reference.
+    # Readers take `current` without locking and serve its pre-encoded
+    # JSON body; dashboards wait on the version instead of polling.
+    # Resolved predictions are numbered rows in a bounded deque, older
+    # ones page from `archive`.
+
+    def __init__(self, state, mirror=None):
+
+        self.state = state
+        self.lock = threading.RLock()
+        self.cond = threading.Condition()
+
+        # mirror: HistoryStore other processes read the state from
+        self.mirror = mirror
+        version = mirror.state_version() if mirror else 0
+        self.current = (version, freeze_state(state), encode_state(state))
+
+        self.seq = 0
+        self.rows = deque(maxlen=HISTORY_ROWS)
+        self.archive = None
+
+    def snapshot(self):
+        version, state, _ = self.current
+        return version, state
+
+    def encoded(self):
+        version, _, body = self.current
+        return version, body
+
+    def add_row(self, row):
+
+        with self.cond:
+            self.seq += 1
+            row["seq"] = self.seq
+            self.rows.append(row)
+
+        if self.archive:
+            self.archive.add_prediction(row)
+
+        return row
+
+    def history(self, since=None, before=None, limit=HISTORY_PAGE):
+
+        # since: the oldest `limit` rows after `since`, oldest first; page
+        # forward from the last one returned
+        # before: up to `limit` rows older than `before`, newest first
+        # neither: the newest `limit` rows, oldest first
+        if before is not None and self.archive:
+            return self.archive.predictions(before, limit)
+
+        with self.cond:
+            rows = list(self.rows)
+
+        if before is not None:
+            return [r for r in reversed(rows) if r["seq"] < before][:limit]
+
+        if since is not None:
+            # Rows the deque has already dropped are still in the archive
+            if self.archive and rows and since < rows[0]["seq"] - 1:
+                return self.archive.predictions_since(since, limit)
+            return [r for r in rows if r["seq"] > since][:limit]
+
+        return rows[-limit:] if limit else []
+
+    def publish(self):
+
+        # Encode once per version, not once per request. The store write
+        # stays under the lock so versions reach it in order.
+        with self.lock:
+            body = encode_state(self.state)
+            version = self.current[0] + 1
+            self.current = (version, freeze_state(self.state), body)
+            if self.mirror:
+                self.mirror.save_state(version, body.decode())
+
+        with self.cond:
+            self.cond.notify_all()
+
+    def wait(self, version, timeout):
+
+        # Returns as soon as the version differs from `version`,
+        # or the unchanged version after `timeout` seconds
+        with self.cond:
+            self.cond.wait_for(lambda: self.current[0] != version, timeout)
+            return self.current[0]
+
+PUBLISHERS = {
+    name: Publisher(APP_STATE if name == DEFAULT_FEED else new_state())
+    for name in FEEDS
+}
+
+class SharedState:
+
+    # A follower's read-only view of what the leader publishes to the store.
+    # Re-checks the stored version at most every SHARED_POLL seconds; one
+    # reader does the check while the rest keep serving `current`.
+
+    def __init__(self, store):
+
+        self.store = store
+        self.lock = threading.Lock()
+        state = new_state()
+        # Version 0 until the leader publishes, as on the leader itself
+        self.current = (0, state, encode_state(state))
+        self.checked = 0
+
+    def refresh(self):
+
+        now = time.monotonic()
+
+        if now - self.checked >= SHARED_POLL and self.lock.acquire(blocking=False):
+            try:
+                self.checked = now
+                if self.store.state_version() != self.current[0]:
+                    v, body = self.store.load_state()
+                    if body is not None:
+                        self.current = (v, json.loads(body), body.encode())
+            finally:
+                self.lock.release()
+
+        return self.current
+
+    def snapshot(self):
+        version, state, _ = self.refresh()
+        return version, state
+
+    def encoded(self):
+        version, _, body = self.refresh()
+        return version, body
+
+    def wait(self, version, timeout):
+
+        end = time.monotonic() + timeout
+
+        while True:
+            v, _ = self.snapshot()
+            if v != version or time.monotonic() >= end:
+                return v
+            time.sleep(SHARED_POLL)
+
+    def history(self, since=None, before=None, limit=HISTORY_PAGE):
+
+        if before is not None:
+            return self.store.predictions(before, limit)
+
+        if since is not None:
+            return self.store.predictions_since(since, limit)
+
+        rows = self.store.predictions(self.store.last_seq() + 1, limit)
+        rows.reverse()
+        return rows
+
+# =====================================================
+# METRICS (PROMETHEUS TEXT FORMAT)
+# =====================================================
+
+METRIC_HELP = {
+    "perfectx_stage_seconds": ("histogram", "Time spent in each stage of a draw cycle"),
+    "perfectx_predict_seconds": ("histogram", "Time spent in each model's predict"),
+    "perfectx_retrain_seconds": ("histogram", "AiCore retrain duration"),
+    "perfectx_retrain_errors_total": ("counter", "Background retrains that failed"),
+    "perfectx_model_save_errors_total": ("counter", "Fitted models that could not be saved"),
+    "perfectx_voter_timeouts_total": ("counter", "Votes counted as WAIT for missing the budget"),
+    "perfectx_api_errors_total": ("counter", "Failed requests to the history API"),
+    "perfectx_loop_errors_total": ("counter", "Errors while handling a new draw"),
+    "perfectx_startup_errors_total": ("counter", "Errors while preparing a feed to start"),
+    "perfectx_skips_total": ("counter", "Issues skipped instead of predicted"),
+    "perfectx_results_total": ("counter", "Settled predictions by result"),
+    "perfectx_last_issue_age_seconds": ("gauge", "Seconds since the newest issue was first seen"),
+}
+
+class Histogram:
+
+    # One labelled series. Each series has a single writer (one feed's poll
+    # step, or its trainer), so observing takes no lock. Also a timer:
+    # `with hist:` observes the time spent in the block.
+
+    def __init__(self):
+
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0
+        self.started = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.observe(time.perf_counter() - self.started)
+
+class Metrics:
+
+    # Recording is a counter bump or a bucket increment; nothing is
+    # formatted until /metrics is scraped. Series are keyed by (name, labels).
+
+    def __init__(self):
+
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.hists = {}
+        self.gauges = {}     # key -> function evaluated at scrape time
+
+    def inc(self, name, n=1, **labels):
+
+        key = (name, tuple(sorted(labels.items())))
+
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    def histogram(self, name, **labels):
+
+        key = (name, tuple(sorted(labels.items())))
+
+        with self.lock:
+            if key not in self.hists:
+                self.hists[key] = Histogram()
+            return self.hists[key]
+
+    def gauge(self, name, fn, **labels):
+        self.gauges[(name, tuple(sorted(labels.items())))] = fn
+
+    def render(self):
+
+        with self.lock:
+            counters = dict(self.counters)
+            hists = {k: v.counts + [v.sum] for k, v in self.hists.items()}
+
+        series = {}
+
+        for (name, labels), v in counters.items():
+            series.setdefault(name, []).append(f"{name}{fmt_labels(labels)} {v}")
+
+        for (name, labels), h in hists.items():
+            lines = series.setdefault(name, [])
+            total = 0
+            for le, n in zip(LATENCY_BUCKETS + ("+Inf",), h):
+                total += n
+                lines.append(f"{name}_bucket{fmt_labels(labels + (('le', str(le)),))} {total}")
+            lines.append(f"{name}_sum{fmt_labels(labels)} {h[-1]}")
+            lines.append(f"{name}_count{fmt_labels(labels)} {total}")
+
+        for (name, labels), fn in list(self.gauges.items()):
+            try:
+                v = fn()
+            except Exception:
+                continue
+            if v is not None:
+                series.setdefault(name, []).append(f"{name}{fmt_labels(labels)} {v}")
+
+        out = []
+        for name in sorted(series):
+            kind, text = METRIC_HELP.get(name, ("untyped", name))
+            out.append(f"# HELP {name} {text}")
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(series[name])
+
+        return "\n".join(out) + "\n"
+
+def fmt_labels(labels):
+
+    if not labels:
+        return ""
+
+    pairs = []
+    for k, v in labels:
+        v = str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{k}="{v}"')
+
+    return "{" + ",".join(pairs) + "}"
+
+METRICS = Metrics()
+
+# Set on gunicorn followers: /metrics then serves the leader's last dump
+METRICS_MIRROR = None
+
+# =====================================================
+# DRAW BUFFER (FIXED-CAPACITY COLUMNAR RING)
+# =====================================================
+
+class DrawBuffer:
+
+    # Every slot is written twice (at p and p+capacity) so the live
+    # window is always one contiguous slice of the backing arrays.
+
+    def __init__(self, capacity=HISTORY_LIMIT):
+
+        self.capacity = capacity
+        self.head = 0
+        self.count = 0
+
+        self._ids = np.zeros(2 * capacity, dtype=np.int64)
+        self._nums = np.zeros(2 * capacity, dtype=np.int8)
+        self._big = np.zeros(2 * capacity, dtype=np.uint8)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("draw index out of range")
+
+        p = self.head + index
+        return {
+            "id": str(self._ids[p]),
+            "n": int(self._nums[p]),
+            "res": "BIG" if self._big[p] else "SMALL"
+        }
+
+    def full(self):
+        return self.count == self.capacity
+
+    def append(self, issue, n):
+
+        if self.count < self.capacity:
+            p = self.head + self.count
+            self.count += 1
+        else:
+            p = self.head
+            self.head = (self.head + 1) % self.capacity
+
+        p %= self.capacity
+        n = int(n)
+
+        for q in (p, p + self.capacity):
+            self._ids[q] = int(issue)
+            self._nums[q] = n
+            self._big[q] = 1 if n >= 5 else 0
+
+    def extend(self, rows):
+        for issue, n in rows:
+            self.append(issue, n)
+
+    def copy(self):
+
+        b = DrawBuffer(self.capacity)
+        b.head = self.head
+        b.count = self.count
+        b._ids[:] = self._ids
+        b._nums[:] = self._nums
+        b._big[:] = self._big
+        return b
+
+    @property
+    def ids(self):
+        return self._ids[self.head:self.head + self.count]
+
+    @property
+    def nums(self):
+        return self._nums[self.head:self.head + self.count]
+
+    @property
+    def big(self):
+        return self._big[self.head:self.head + self.count]
+
+# =====================================================
+# HISTORY STORE (APPEND-ONLY, KEYED BY ISSUE NUMBER)
+# =====================================================
+
+class HistoryStore:
+
+    def __init__(self, path=HISTORY_DB):
+
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS draws ("
+            "issue INTEGER PRIMARY KEY, number INTEGER NOT NULL)"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            "seq INTEGER PRIMARY KEY, period TEXT, pred TEXT, res TEXT, ts REAL)"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS published_state ("
+            "id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER, body TEXT)"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS published_metrics ("
+            "id INTEGER PRIMARY KEY CHECK (id = 1), body TEXT)"
+        )
+        self.db.commit()
+
+    def last_id(self):
+
+        with self.lock:
+            row = self.db.execute("SELECT MAX(issue) FROM draws").fetchone()
+
+        return row[0]
+
+    def load(self, limit):
+
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT issue, number FROM draws ORDER BY issue DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+
+        rows.reverse()
+        return rows
+
+    def append(self, rows):
+
+        with self.lock:
+            self.db.executemany(
+                "INSERT OR IGNORE INTO draws (issue, number) VALUES (?, ?)",
+                rows
+            )
+            self.db.commit()
+
+    def replace(self, rows):
+
+        # Drop every stored draw and keep only `rows`, in one transaction
+        with self.lock:
+            self.db.execute("DELETE FROM draws")
+            self.db.executemany(
+                "INSERT OR IGNORE INTO draws (issue, number) VALUES (?, ?)",
+                rows
+            )
+            self.db.commit()
+
+    def last_seq(self):
+
+        with self.lock:
+            row = self.db.execute("SELECT MAX(seq) FROM predictions").fetchone()
+
+        return row[0] or 0
+
+    def add_prediction(self, row):
+
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO predictions (seq, period, pred, res, ts) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (row["seq"], row["period"], row["pred"], row["res"], time.time())
+            )
+            self.db.commit()
+
+    def predictions_since(self, since, limit):
+
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT seq, period, pred, res FROM predictions "
+                "WHERE seq > ? ORDER BY seq ASC LIMIT ?",
+                (since, limit)
+            ).fetchall()
+
+        return [{"seq": q, "period": p, "pred": d, "res": r} for q, p, d, r in rows]
+
+    def state_version(self):
+
+        with self.lock:
+            row = self.db.execute("SELECT version FROM published_state WHERE id = 1").fetchone()
+
+        return row[0] if row else 0
+
+    def load_state(self):
+
+        with self.lock:
+            row = self.db.execute("SELECT version, body FROM published_state WHERE id = 1").fetchone()
+
+        return row if row else (0, None)
+
+    def save_state(self, version, body):
+
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO published_state (id, version, body) VALUES (1, ?, ?)",
+                (version, body)
+            )
+            self.db.commit()
+
+    def load_metrics(self):
+
+        with self.lock:
+            row = self.db.execute("SELECT body FROM published_metrics WHERE id = 1").fetchone()
+
+        return row[0] if row else ""
+
+    def save_metrics(self, body):
+
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO published_metrics (id, body) VALUES (1, ?)",
+                (body,)
+            )
+            self.db.commit()
+
+    def predictions(self, before, limit):
+
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT seq, period, pred, res FROM predictions "
+                "WHERE seq < ? ORDER BY seq DESC LIMIT ?",
+                (before, limit)
+            ).fetchall()
+
+        return [{"seq": q, "period": p, "pred": d, "res": r} for q, p, d, r in rows]
+
+# =====================================================
+# EVENT LOG (MEMORY-MAPPED, APPEND-ONLY)
+# =====================================================
+
+EVENT_VOTERS = 8       # voter slots per record; voters past these aren't logged
+EVENT_HEADER = 4096    # magic, record count, JSON metadata
+EVENT_MAGIC = b"PXEVLOG1"
+
+EVENT_DTYPE = np.dtype([
+    ("ts", "<f8"),          # when the record was written (unix time)
+    ("decided", "<f8"),     # when the prediction was made
+    ("issue", "<i8"),
+    ("kind", "i1"),         # EV_DECIDE or EV_RESOLVE
+    ("pred", "i1"),         # 1 BIG, 0 SMALL, -1 SKIP
+    ("result", "i1"),       # drawn side, -1 when not known
+    ("outcome", "i1"),      # index into OUTCOMES
+    ("anomaly", "i1"),
+    ("conf", "<f4"),
+    ("required", "<f4"),
+    ("sides", "i1", (EVENT_VOTERS,)),   # per voter slot: 1 BIG, 0 SMALL, -1 WAIT
+    ("confs", "<f4", (EVENT_VOTERS,)),
+])
+
+EV_DECIDE, EV_RESOLVE = 0, 1
+OUTCOMES = ("PENDING", "WIN", "LOSS", "VOID", "SKIP")
+SIDES = {"SMALL": 0, "BIG": 1}
+
+class EventLog:
+
+    # One EVENT_DTYPE record per decision (skips included) and one per
+    # resolution. A resolution repeats its decision's fields, so queries
+    # need only the EV_RESOLVE rows. Records go through a memmap grown
+    # EVENT_CHUNK at a time; the count in the header is bumped after each
+    # record is written, so readers never see a half-written one.
+
+    def __init__(self, path):
+
+        self.path = path
+        self.pending = None
+
+        if not os.path.exists(path) or os.path.getsize(path) < EVENT_HEADER:
+            self.voters = list(VOTERS)[:EVENT_VOTERS]
+            with open(path, "wb") as f:
+                f.write(event_header(0, self.voters))
+        else:
+            count, meta = read_event_header(path)
+            # Slots follow the file; voters registered since take free ones
+            self.voters = meta["voters"]
+            for name in VOTERS:
+                if name not in self.voters and len(self.voters) < EVENT_VOTERS:
+                    self.voters.append(name)
+            with open(path, "r+b") as f:
+                f.write(event_header(count, self.voters))
+
+        self.slot = {name: i for i, name in enumerate(self.voters)}
+        self.head = np.memmap(path, dtype="<i8", mode="r+", offset=len(EVENT_MAGIC), shape=(1,))
+        self.count = int(self.head[0])
+        self.rows = None
+        self.grow()
+
+    def grow(self):
+
+        size = os.path.getsize(self.path)
+        capacity = (size - EVENT_HEADER) // EVENT_DTYPE.itemsize
+
+        if capacity <= self.count:
+            if self.rows is not None:
+                self.rows.flush()
+            capacity = self.count + EVENT_CHUNK
+            with open(self.path, "r+b") as f:
+                f.truncate(EVENT_HEADER + capacity * EVENT_DTYPE.itemsize)
+
+        self.rows = np.memmap(self.path, dtype=EVENT_DTYPE, mode="r+",
+                              offset=EVENT_HEADER, shape=(capacity,))
+
+    def append(self, rec):
+
+        if self.count >= len(self.rows):
+            self.grow()
+
+        self.rows[self.count] = rec
+        self.count += 1
+        self.head[0] = self.count
+
+    def decide(self, issue, pred, conf, required, ballot, anomaly):
+
+        rec = np.zeros((), dtype=EVENT_DTYPE)
+        rec["ts"] = rec["decided"] = time.time()
+        rec["issue"] = int(issue)
+        rec["kind"] = EV_DECIDE
+        rec["pred"] = SIDES.get(pred, -1)
+        rec["result"] = -1
+        rec["anomaly"] = bool(anomaly)
+        rec["conf"] = conf
+        rec["required"] = required
+        rec["sides"] = -1
+
+        for name, (side, c) in ballot:
+            i = self.slot.get(name)
+            if i is not None:
+                rec["sides"][i] = SIDES.get(side, -1)
+                rec["confs"][i] = c
+
+        self.append(rec)
+        self.pending = rec
+
+    def resolve(self, issue, result, outcome):
+
+        if self.pending is not None and int(self.pending["issue"]) == int(issue):
+            rec = self.pending.copy()
+        else:
+            rec = np.zeros((), dtype=EVENT_DTYPE)
+            rec["issue"] = int(issue)
+            rec["pred"] = rec["sides"] = -1
+
+        rec["ts"] = time.time()
+        rec["kind"] = EV_RESOLVE
+        rec["result"] = SIDES.get(result, -1)
+        rec["outcome"] = OUTCOMES.index(outcome)
+
+        self.append(rec)
+        self.pending = None
+
+def event_header(count, voters):
+
+    meta = json.dumps({"itemsize": EVENT_DTYPE.itemsize, "voters": voters}).encode()
+    head = EVENT_MAGIC + np.int64(count).tobytes() + meta
+    return head.ljust(EVENT_HEADER, b"\0")
+
+def read_event_header(path):
+
+    with open(path, "rb") as f:
+        head = f.read(EVENT_HEADER)
+
+    if not head.startswith(EVENT_MAGIC):
+        raise ValueError(f"{path} is not an event log")
+
+    n = len(EVENT_MAGIC)
+    count = int(np.frombuffer(head[n:n + 8], dtype="<i8")[0])
+    meta = json.loads(head[n + 8:].rstrip(b"\0"))
+
+    if meta["itemsize"] != EVENT_DTYPE.itemsize:
+        raise ValueError(f"{path} was written with a different record layout")
+
+    return count, meta
+
+def load_events(path):
+
+    # (records, voter names); records is a read-only memmap of every row
+    # written so far, safe to scan while the leader keeps appending. No
+    # file yet reads as an empty log
+    if not os.path.exists(path):
+        return np.zeros(0, dtype=EVENT_DTYPE), list(VOTERS)[:EVENT_VOTERS]
+
+    count, meta = read_event_header(path)
+
+    if count == 0:
+        return np.zeros(0, dtype=EVENT_DTYPE), meta["voters"]
+
+    rows = np.memmap(path, dtype=EVENT_DTYPE, mode="r", offset=EVENT_HEADER, shape=(count,))
+    return rows, meta["voters"]
+
+CONF_BUCKETS = np.round(np.arange(0.5, 1.0001, 0.05), 2)
+
+def event_stats(rows, voters, by="hour", since=None, until=None):
+
+    # Hit rate of settled predictions grouped by hour of day (UTC), by
+    # confidence bucket, or per voter (every resolved issue its vote
+    # covered, skips included). since / until bound the resolution time.
+    lo = 0 if since is None else np.searchsorted(rows["ts"], since)
+    hi = len(rows) if until is None else np.searchsorted(rows["ts"], until)
+    r = rows[lo:hi]
+    # Pull single columns through the mask rather than whole records
+    res = r["kind"] == EV_RESOLVE
+
+    if by == "voter":
+        result = r["result"][res]
+        known = result >= 0
+        out = []
+        for i, name in enumerate(voters):
+            side = r["sides"][:, i][res]
+            voted = known & (side >= 0)
+            n = int(voted.sum())
+            hits = int((side[voted] == result[voted]).sum())
+            out.append({"bucket": name, "predictions": n, "wins": hits,
+                        "hit_rate": round(hits / n, 4) if n else None})
+        return out
+
+    outcome = r["outcome"]
+    settled = res & ((outcome == 1) | (outcome == 2))
+    won = outcome[settled] == 1
+
+    if by == "hour":
+        key = (r["decided"][settled] // 3600 % 24).astype(np.int64)
+        labels = list(range(24))
+    elif by == "conf":
+        key = np.digitize(r["conf"][settled], CONF_BUCKETS[1:-1])
+        labels = [f"{a:.2f}-{b:.2f}" for a, b in zip(CONF_BUCKETS[:-1], CONF_BUCKETS[1:])]
+    else:
+        raise ValueError(f"unknown grouping {by}")
+
+    total = np.bincount(key, minlength=len(labels))
+    wins = np.bincount(key, weights=won, minlength=len(labels)).astype(np.int64)
+
+    return [
+        {"bucket": labels[i], "predictions": int(total[i]), "wins": int(wins[i]),
+         "hit_rate": round(wins[i] / total[i], 4) if total[i] else None}
+        for i in range(len(labels))
+    ]
+
+# =====================================================
+# DATA MANAGER
+# =====================================================
+
+def http_session(size=SYNC_WORKERS, hosts=1):
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=hosts, pool_maxsize=size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+class DataManager:
+
+    # session: a requests.Session shared with other feeds, or None for a
+    # private one
+
+    def __init__(self, store=None, url=None, session=None, feed=DEFAULT_FEED):
+        self.history = DrawBuffer(HISTORY_LIMIT)
+        self.store = store
+        self.url = url or API_URL
+        self.session = session or http_session()
+        self.feed = feed
+
+    def size(self, n):
+        return "BIG" if int(n) >= 5 else "SMALL"
+
+    def fetch_page(self, p):
+
+        try:
+            r = self.session.get(
+                self.url,
+                params={"size": str(SYNC_PAGE_SIZE), "pageNo": str(p)},
+                timeout=6
+            )
+            data = r.json()["data"]["list"]
+            # One broken row fails the whole page, like a bad response
+            for i in data:
+                int(i["issueNumber"]), int(i["number"])
+            return data
+        except Exception as e:
+            METRICS.inc("perfectx_api_errors_total", feed=self.feed, error=type(e).__name__)
+            return None
+
+    def recent(self, n):
+
+        # The newest n draws, newest first
+        r = self.session.get(
+            self.url,
+            params={"size": str(n), "pageNo": "1"},
+            timeout=5
+        )
+        return r.json()["data"]["list"]
+
+    def latest(self):
+        return self.recent(1)[0]
+
+    def restore(self):
+
+        # History from the store alone, no network; False when it holds too
+        # few draws to start on, so the caller syncs instead
+        rows = self.store.load(HISTORY_LIMIT) if self.store else []
+
+        if len(rows) <= SYNC_MIN:
+            return False
+
+        self.history = DrawBuffer(HISTORY_LIMIT)
+        self.history.extend(rows)
+        return True
+
+    def sync(self):
+
+        raw = {}
+        last = self.store.last_id() if self.store else None
+        reached = False
+
+        with ThreadPoolExecutor(max_workers=SYNC_WORKERS) as pool:
+
+            # Fetch pages in waves so we can stop early without
+            # hammering the API for pages we will never use
+            for first in range(1, SYNC_PAGES + 1, SYNC_WORKERS):
+
+                pages = range(first, min(first + SYNC_WORKERS, SYNC_PAGES + 1))
+                done = False
+
+                for p, data in zip(pages, pool.map(self.fetch_page, pages)):
+
+                    # An empty page may be a hiccup rather than the end of
+                    # the feed's history, so it gets the same retries
+                    for _ in range(SYNC_RETRIES):
+                        if data:
+                            break
+                        data = self.fetch_page(p)
+
+                    # Nothing later fetches an older page again, so a page
+                    # lost here would stay a hole in the store for good
+                    if data is None:
+                        return False
+
+                    if not data:
+                        done = True
+                        break
+                    for i in data:
+                        raw[int(i["issueNumber"])] = i
+                    # Page reached what we already have on disk
+                    if last is not None and int(data[-1]["issueNumber"]) <= last:
+                        reached = done = True
+                        break
+
+                if done or len(raw) >= HISTORY_LIMIT:
+                    break
+
+        # Stored draws only continue into the fetched ones if the pages got
+        # back to them; after a longer outage the stale ones are dropped
+        # rather than spliced onto fresh history across a gap
+        if not reached:
+            last = None
+
+        raw = [(k, int(raw[k]["number"])) for k in sorted(raw) if last is None or k > last]
+
+        history = DrawBuffer(HISTORY_LIMIT)
+        if last is not None:
+            history.extend(self.store.load(HISTORY_LIMIT))
+        history.extend(raw)
+
+        # A sync too short to start on is a failure: keep it out of the
+        # store too, or the next restore() would start from it
+        if len(history) <= SYNC_MIN:
+            return False
+
+        if self.store and last is None:
+            self.store.replace(raw)
+        elif self.store:
+            self.store.append(raw)
+
+        self.history = history
+        return True
+
+    def add(self, cid, num):
+
+        self.history.append(cid, num)
+
+        if self.store:
+            self.store.append([(int(cid), num)])
+
+# =====================================================
+# AI CORE
+# =====================================================
+
+# Every feature vector extract() can produce: 6 lag bits, streak 0-9, n % 3
+def _feature_grid():
+
+    lags = (np.arange(64)[:, None] >> np.arange(6)) & 1
+    g = np.zeros((64, 10, 3, 8), dtype=np.int64)
+    g[..., 0:6] = lags[:, None, None, :]
+    g[..., 6] = np.arange(10)[None, :, None]
+    g[..., 7] = np.arange(3)[None, None, :]
+    return g.reshape(-1, 8)
+
+FEATURE_GRID = _feature_grid()
+LAG_BITS = 1 << np.arange(6)
+
+def new_gbm():
+
+    # sklearn costs over a second to import, so it is only pulled in by
+    # the first fit (or the leader's prewarm), never at module load
+    from sklearn.ensemble import GradientBoostingClassifier
+
+    return GradientBoostingClassifier(
+        n_estimators=GB_ESTIMATORS,
+        learning_rate=GB_LEARNING_RATE,
+        max_depth=GB_MAX_DEPTH,
+        random_state=0
+    )
+
+class AiCore:
+
+    # predict() only reads `table`, so a reloaded AiCore serves without
+    # sklearn; `model` stays pickled bytes until a retrain needs it.
+
+    def __init__(self):
+
+        self.model = None
+        self.trees = 0
+        self.trained = False
+        self.table = None
+        self.cursor = None   # issue of the newest draw it was fitted on
+
+    def __getstate__(self):
+
+        state = self.__dict__.copy()
+        if state["model"] is not None and not isinstance(state["model"], bytes):
+            state["model"] = pickle.dumps(state["model"], protocol=pickle.HIGHEST_PROTOCOL)
+        return state
+
+    def gbm(self):
+
+        if isinstance(self.model, bytes):
+            self.model = pickle.loads(self.model)
+        return self.model
+
+    def extract(self, h, index):
+
+        big = h.big
+        f = []
+
+        for j in range(1, 7):
+            if index-j >= 0:
+                f.append(int(big[index-j]))
+            else:
+                f.append(0)
+
+        streak = 0
+        if index > 0:
+            c = big[index-1]
+            for k in range(1, 10):
+                if index-k >= 0 and big[index-k] == c:
+                    streak += 1
+                else:
+                    break
+
+        f.append(streak)
+        f.append(int(h.nums[index-1]) % 3 if index > 0 else 0)
+
+        return f
+
+    def features(self, h, start, stop):
+
+        # Same rows as [extract(h, i) for i in range(start, stop)], built in
+        # one pass. Only the last 10 draws before `start` can affect them.
+        if stop <= start:
+            return np.zeros((0, 8), dtype=np.int64)
+
+        base = max(0, start - 10)
+        end = max(base, stop - 1)
+        big = h.big[base:end].astype(np.int64)
+        nums = h.nums[base:end].astype(np.int64)
+        lo, hi = start - base, stop - base
+
+        X = np.zeros((hi - lo, 8), dtype=np.int64)
+
+        pad = np.concatenate([np.zeros(6, dtype=np.int64), big])
+        X[:, 0:6] = sliding_window_view(pad, 6)[lo:hi, ::-1]
+
+        if len(big):
+            pos = np.arange(len(big))
+            change = np.ones(len(big), dtype=bool)
+            change[1:] = big[1:] != big[:-1]
+            run = pos - np.maximum.accumulate(np.where(change, pos, 0)) + 1
+
+            prev = np.arange(lo, hi) - 1
+            has = prev >= 0
+            X[has, 6] = np.minimum(run[prev[has]], 9)
+            X[has, 7] = nums[prev[has]] % 3
+
+        return X
+
+    def train(self, h):
+
+        start = max(10, len(h) - TRAIN_SIZE)
+
+        X = self.features(h, start, len(h))
+        y = h.big[start:].astype(np.int64)
+
+        if len(set(y.tolist())) > 1:
+            if self.model is None:
+                self.model = new_gbm()
+            self.model.fit(X, y)
+            self.table = self.model.predict_proba(FEATURE_GRID)
+            self.trees = self.model.n_estimators
+            self.trained = True
+            self.cursor = int(h.ids[-1])
+
+    def grow(self, h):
+
+        # A new AiCore with GB_GROW_TREES more trees boosted on the current
+        # window, leaving this one untouched for the poll loop
+        ai = AiCore()
+        ai.model = copy.deepcopy(self.gbm())
+        ai.model.set_params(
+            warm_start=True,
+            n_estimators=self.trees + GB_GROW_TREES
+        )
+        ai.train(h)
+        return ai
+
+    def save(self, path):
+
+        # Written aside and renamed, so a crash never leaves half a file
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def code(self, f):
+
+        lags = 0
+        for j in range(6):
+            lags |= f[j] << j
+
+        return (lags * 10 + f[6]) * 3 + f[7]
+
+    def lookup(self, X):
+
+        # Rows of [P(SMALL), P(BIG)] for a batch of feature vectors
+        X = np.asarray(X)
+        code = ((X[:, 0:6] @ LAG_BITS) * 10 + X[:, 6]) * 3 + X[:, 7]
+        return self.table[code]
+
+    def predict(self, h):
+
+        if not self.trained:
+            return "WAIT", 0
+
+        feat = self.extract(h, len(h))
+        probs = self.table[self.code(feat)]
+
+        if probs[1] > probs[0]:
+            return "BIG", probs[1]
+        else:
+            return "SMALL", probs[0]
+
+def load_model(path):
+
+    # None when missing or unreadable
+    try:
+        with open(path, "rb") as f:
+            ai = pickle.load(f)
+    except Exception:
+        return None
+
+    return ai if isinstance(ai, AiCore) and ai.trained else None
+
+# =====================================================
+# MARKOV CORE
+# =====================================================
+
+def pack_bits(bits):
+
+    c = 0
+    for x in bits:
+        c = (c << 1) | x
+    return c
+
+class MarkovCore:
+
+    # counts[o][ctx] = [SMALL, BIG] seen after the o-draw context `ctx`,
+    # packed as bits with the oldest draw first
+
+    def __init__(self, order=MARKOV_ORDER):
+
+        self.order = order
+        self.counts = [[[0, 0] for _ in range(1 << o)] for o in range(order + 1)]
+
+    def train(self, h):
+
+        b = h.big.astype(np.int64)
+
+        for o in range(1, self.order + 1):
+
+            if len(b) <= o:
+                self.counts[o] = [[0, 0] for _ in range(1 << o)]
+                continue
+
+            ctx = sliding_window_view(b[:-1], o) @ (1 << np.arange(o - 1, -1, -1))
+            c = np.bincount(ctx * 2 + b[o:], minlength=2 << o)
+            self.counts[o] = c.reshape(-1, 2).tolist()
+
+    def update(self, h):
+
+        # h has just had one draw appended
+        tail = h.big[-(self.order + 1):].tolist()
+        nxt = tail[-1]
+
+        for o in range(1, min(self.order, len(tail) - 1) + 1):
+            self.counts[o][pack_bits(tail[-1-o:-1])][nxt] += 1
+
+    def evict(self, h):
+
+        # h is full and its oldest draw is about to be dropped
+        head = h.big[:self.order + 1].tolist()
+
+        for o in range(1, min(self.order, len(head) - 1) + 1):
+            self.counts[o][pack_bits(head[:o])][head[o]] -= 1
+
+    def predict(self, h):
+
+        tail = h.big[-self.order:].tolist()
+
+        # Back off to shorter contexts until one has enough observations
+        for o in range(len(tail), 0, -1):
+
+            stats = self.counts[o][pack_bits(tail[-o:])]
+            total = stats[0] + stats[1]
+
+            if total < MARKOV_MIN_OBS:
+                continue
+
+            p = stats[1] / total
+
+            if p > 0.5:
+                return "BIG", p
+            elif p < 0.5:
+                return "SMALL", 1-p
+
+            return "WAIT", 0
+
+        return "WAIT", 0
+
+# =====================================================
+# DEEP PATTERN
+# =====================================================
+
+class DeepPattern:
+
+    # For each depth, index[d][ctx] holds the positions where context `ctx`
+    # was followed by SMALL and by BIG. Positions are global draw numbers, so
+    # the oldest match is always at the front and eviction is a popleft.
+
+    def __init__(self, depths=PATTERN_DEPTHS):
+
+        self.depths = depths
+        self.index = {d: {} for d in depths}
+        self.seq = 0
+
+    def train(self, h):
+
+        b = h.big.tolist()
+        self.index = {d: {} for d in self.depths}
+        self.seq = len(b)
+
+        for d in self.depths:
+            idx = self.index[d]
+            for i in range(len(b) - d):
+                k = pack_bits(b[i:i+d])
+                if k not in idx:
+                    idx[k] = (deque(), deque())
+                idx[k][b[i+d]].append(i)
+
+    def update(self, h):
+
+        # h has just had one draw appended
+        tail = h.big[-(max(self.depths) + 1):].tolist()
+        self.seq += 1
+
+        for d in self.depths:
+            if len(tail) > d:
+                k = pack_bits(tail[-1-d:-1])
+                idx = self.index[d]
+                if k not in idx:
+                    idx[k] = (deque(), deque())
+                idx[k][tail[-1]].append(self.seq - 1 - d)
+
+    def evict(self, h):
+
+        # h is full and its oldest draw is about to be dropped
+        head = h.big[:max(self.depths) + 1].tolist()
+
+        for d in self.depths:
+            if len(head) > d:
+                self.index[d][pack_bits(head[:d])][head[d]].popleft()
+
+    def predict(self, h):
+
+        if len(h) < 20:
+            return "WAIT", 0
+
+        tail = h.big[-max(self.depths):].tolist()
+
+        best = "WAIT"
+        best_conf = 0
+
+        for d in self.depths:
+
+            pos = self.index[d].get(pack_bits(tail[-d:]))
+            if pos is None:
+                continue
+
+            small, big = len(pos[0]), len(pos[1])
+            total = small + big
+
+            if total >= PATTERN_MIN_MATCHES:
+
+                # On a tie the side seen first wins, as Counter.most_common did
+                if big > small or (big == small and small and pos[1][0] < pos[0][0]):
+                    top, side = big, "BIG"
+                else:
+                    top, side = small, "SMALL"
+
+                conf = top / total
+
+                if conf > best_conf:
+                    best_conf = conf
+                    best = side
+
+        return best, best_conf
+
+# =====================================================
+# ANOMALY DETECTOR
+# =====================================================
+
+class AnomalyDetector:
+
+    def __init__(self, rules=ANOMALY_RULES):
+
+        self.rules = rules
+        self.windows = sorted({w for w, _, _ in rules})
+        self.runs = sorted({r for _, r, _ in rules})
+        self.reset()
+
+    def reset(self):
+
+        self.seq = 0
+        self.run = 0
+        self.last = None
+        # Global position of the latest draw that completed a run of r
+        self.hit = {r: None for r in self.runs}
+        self.counts = {w: [0] * 10 for w in self.windows}
+
+    def train(self, h):
+
+        self.reset()
+        nums = h.nums.tolist()
+
+        for n in nums:
+            self._push(n)
+
+        for w in self.windows:
+            for n in nums[-w:]:
+                self.counts[w][n] += 1
+
+    def _push(self, n):
+
+        self.run = self.run + 1 if n == self.last else 1
+        self.last = n
+
+        for r in self.runs:
+            if self.run >= r:
+                self.hit[r] = self.seq
+
+        self.seq += 1
+
+    def update(self, h):
+
+        # h has just had one draw appended
+        nums = h.nums
+        n = int(nums[-1])
+        self._push(n)
+
+        for w in self.windows:
+            self.counts[w][n] += 1
+            if len(nums) > w:
+                self.counts[w][int(nums[-1-w])] -= 1
+
+    def evict(self, h):
+
+        # Windows as wide as the buffer lose the draw the buffer drops
+        n = int(h.nums[0])
+
+        for w in self.windows:
+            if w >= len(h):
+                self.counts[w][n] -= 1
+
+    def check(self, h):
+
+        # Returns the label of the first rule that fired, or None
+        for w, r, c in self.rules:
+
+            if len(h) < w:
+                continue
+
+            hit = self.hit[r]
+            if hit is not None and hit - r + 1 >= self.seq - w:
+                return f"RUN{r}@{w}"
+
+            if max(self.counts[w]) > c:
+                return f"COUNT>{c}@{w}"
+
+        return None
+
+# =====================================================
+# JARVIS BALANCED
+# =====================================================
+
+class Jarvis:
+
+    def __init__(self):
+
+        self.loss_streak = 0
+        self.ai_weight = AI_WEIGHT
+
+    def resolve(self, win):
+
+        if win:
+            self.loss_streak = max(0, self.loss_streak-1)
+            self.ai_weight *= 1 + AI_WEIGHT_STEP
+        else:
+            self.loss_streak += 1
+            self.ai_weight *= 1 - AI_WEIGHT_STEP
+
+        self.ai_weight = max(AI_WEIGHT_MIN, min(AI_WEIGHT_MAX, self.ai_weight))
+
+    def weight(self, voter):
+        return self.ai_weight if voter == "ai" else 1
+
+    def required_conf(self):
+
+        if self.loss_streak == 0:
+            return BASE_CONF
+        elif self.loss_streak == 1:
+            return BASE_CONF + CONF_STEP
+        else:
+            return BASE_CONF + CONF_STEP * 2
+
+# =====================================================
+# ENSEMBLE (VOTERS UNDER A LATENCY BUDGET)
+# =====================================================
+
+# Models that vote on each issue: name -> factory building one per feed.
+# A voter needs predict(h) -> (side, confidence); PerfectXAI also calls
+# whichever of these it has:
+#   train(h)   fit on the whole history at warm-up and after a resync
+#   update(h)  h has just had one draw appended
+#   evict(h)   h is full and its oldest draw is about to be dropped
+# "ai" is required and special: the Trainer refits it in the background
+# and swaps it in, and Jarvis weights it. The rest count once.
+VOTERS = {
+    "ai": AiCore,
+    "markov": MarkovCore,
+    "pattern": DeepPattern,
+}
+
+VOTE_POOL = ThreadPoolExecutor(max_workers=VOTE_WORKERS)
+
+class Ensemble:
+
+    # Collects a vote from every one of the bot's voters. Voters that have been
+    # fast run inline, where a thread hop would cost more than the call.
+    # Slower ones go to VOTE_POOL first and get until VOTE_BUDGET runs out.
+    # A voter that misses it, is still busy from the last issue, or raises,
+    # votes WAIT. With concurrent=False (replays) every voter runs inline
+    # with no deadline, so results are repeatable.
+
+    def __init__(self, bot, concurrent=True):
+
+        self.bot = bot
+        self.concurrent = concurrent
+
+        # Moving average latency; None until a voter's first call, which
+        # goes off-thread so an unknown model can't stall the decision
+        self.avg = {name: None for name in bot.voters}
+        self.busy = {}
+        self.time = {
+            name: METRICS.histogram("perfectx_predict_seconds", feed=bot.feed, model=name)
+            for name in bot.voters
+        }
+
+    def call(self, name, h):
+
+        t = time.perf_counter()
+
+        try:
+            out = self.bot.voters[name].predict(h)
+        except Exception:
+            out = ("WAIT", 0)
+
+        took = time.perf_counter() - t
+        self.time[name].observe(took)
+        avg = self.avg[name]
+        self.avg[name] = took if avg is None else avg + (took - avg) * 0.2
+
+        return out
+
+    def timed_out(self, name):
+
+        METRICS.inc("perfectx_voter_timeouts_total", feed=self.bot.feed, model=name)
+        return ("WAIT", 0)
+
+    def run(self, h):
+
+        votes = {}
+        slow = {}
+        deadline = time.monotonic() + VOTE_BUDGET
+
+        if self.concurrent:
+            for name in self.bot.voters:
+                avg = self.avg[name]
+                if avg is not None and avg < VOTE_INLINE:
+                    continue
+                f = self.busy.get(name)
+                if f is not None and not f.done():
+                    votes[name] = self.timed_out(name)
+                else:
+                    slow[name] = self.busy[name] = VOTE_POOL.submit(self.call, name, h)
+
+        for name in self.bot.voters:
+            if name not in votes and name not in slow:
+                votes[name] = self.call(name, h)
+
+        for name, f in slow.items():
+            try:
+                votes[name] = f.result(timeout=max(0, deadline - time.monotonic()))
+            except Exception:
+                votes[name] = self.timed_out(name)
+
+        # Registry order, so the weighted sum adds up the same way every time
+        return [(name, votes[name]) for name in self.bot.voters]
 
 # =====================================================
-# GLOBAL STATE FOR UI
+# POLLER (CADENCE-AWARE SCHEDULE + BACKOFF)
 # =====================================================
 
-APP_STATE = {
-    "current_period": "WAITING",
-    "current_prediction": "ANALYZING...",
-    "wins": 0,
-    "losses": 0,
-    "current_win_streak": 0,
-    "current_loss_streak": 0,
-    "max_win_streak": 0,
-    "max_loss_streak": 0,
-    "status": "INITIALIZING AI...",
-    "history": []
-}
+class Poller:
 
-def reset_stats():
-    APP_STATE["wins"] = 0
-    APP_STATE["losses"] = 0
-    APP_STATE["current_win_streak"] = 0
-    APP_STATE["current_loss_streak"] = 0
-    APP_STATE["max_win_streak"] = 0
-    APP_STATE["max_loss_streak"] = 0
-    APP_STATE["history"] = []
-    APP_STATE["status"] = "STATS RESET AFTER 20 WINS"
+    def __init__(self, period=None):
 
-# =====================================================
-# DATA MANAGER
-# =====================================================
+        self.period = period or POLL_PERIOD
+        self.seen_at = None   # when the current issue was first seen
+        self.gaps = deque(maxlen=5)
+        self.failures = 0
 
-class DataManager:
+    def changed(self, jump=1, now=None):
 
-    def __init__(self):
-        self.history = []
+        # Per-issue gap between sightings; the median shrugs off the odd
+        # stall, and dividing by the jump covers missed issues. `now` is
+        # when the poll was sent, so slow replies don't push the schedule
+        # later issue after issue.
+        now = time.monotonic() if now is None else now
 
-    def size(self, n):
-        return "BIG" if int(n) >= 5 else "SMALL"
+        if self.seen_at is not None and jump > 0:
+            self.gaps.append((now - self.seen_at) / jump)
+            self.period = statistics.median(self.gaps)
 
-    def sync(self):
+        self.seen_at = now
 
-        raw = []
+    def ok(self):
+        self.failures = 0
 
-        for p in range(1, 20):
-            try:
-                r = requests.get(
-                    API_URL,
-                    params={"size": "50", "pageNo": str(p)},
-                    timeout=6
-                )
-                data = r.json()["data"]["list"]
-                if not data:
-                    break
-                raw.extend(data)
-            except:
-                continue
+    def failed(self):
+        self.failures += 1
+
+    def delay(self):
 
-        raw.sort(key=lambda x: int(x["issueNumber"]))
+        if self.failures:
+            backoff = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (self.failures - 1))
+            return random.uniform(backoff / 2, backoff)
 
-        self.history = [{
-            "id": str(i["issueNumber"]),
-            "n": int(i["number"]),
-            "res": self.size(i["number"])
-        } for i in raw][-HISTORY_LIMIT:]
+        if self.seen_at is None:
+            return POLL_IDLE
 
-        return len(self.history) > 100
+        due = self.seen_at + self.period - POLL_LEAD
+        return max(POLL_FAST, due - time.monotonic())
 
 # =====================================================
-# AI CORE
+# TRAINER (BACKGROUND RETRAIN + HOT SWAP)
 # =====================================================
 
-class AiCore:
+class Trainer:
 
-    def __init__(self):
+    # pool: executor shared with other feeds' trainers; a thread per
+    # retrain when None
+    # current: returns the live AiCore, which retrains grow instead of refit
+    # feed, log: label for the error metric, where failures are reported
 
-        self.model = GradientBoostingClassifier(
-            n_estimators=120,
-            learning_rate=0.05,
-            max_depth=4
-        )
+    def __init__(self, on_ready, background=True, pool=None, current=None,
+                 feed=DEFAULT_FEED, log=print):
 
-        self.trained = False
+        self.on_ready = on_ready
+        self.background = background
+        self.pool = pool
+        self.current = current
+        self.feed = feed
+        self.log = log
 
-    def extract(self, h, index):
+        self.lock = threading.Lock()
+        self.busy = False
+        self.pending = None
 
-        f = []
+    def fit(self, h, full=False):
 
-        for j in range(1, 7):
-            if index-j >= 0:
-                f.append(1 if h[index-j]["res"] == "BIG" else 0)
-            else:
-                f.append(0)
+        t = time.perf_counter()
 
-        streak = 0
-        if index > 0:
-            c = h[index-1]["res"]
-            for k in range(1, 10):
-                if index-k >= 0 and h[index-k]["res"] == c:
-                    streak += 1
-                else:
-                    break
+        base = None if full or not self.current else self.current()
 
-        f.append(streak)
-        f.append(h[index-1]["n"] % 3 if index > 0 else 0)
+        ai = None
 
-        return f
+        if (base is not None and base.trained and GB_GROW_TREES
+                and base.trees + GB_GROW_TREES <= GB_MAX_TREES):
+            try:
+                ai = base.grow(h)
+            except Exception:
+                # e.g. the saved model was pickled by another sklearn
+                ai = None
 
-    def train(self, h):
+        if ai is None:
+            ai = AiCore()
+            ai.train(h)
 
-        X = []
-        y = []
+        self.on_ready(ai, time.perf_counter() - t)
 
-        start = max(10, len(h) - TRAIN_SIZE)
+    def submit(self, h):
 
-        for i in range(start, len(h)):
-            X.append(self.extract(h, i))
-            y.append(1 if h[i]["res"] == "BIG" else 0)
+        if not self.background:
+            self.fit(h)
+            return
 
-        if len(set(y)) > 1:
-            self.model.fit(X, y)
-            self.trained = True
+        snap = h.copy()
 
-    def predict(self, h):
+        with self.lock:
+            if self.busy:
+                # Coalesce: only the newest snapshot is worth fitting
+                self.pending = snap
+                return
+            self.busy = True
 
-        if not self.trained:
-            return "WAIT", 0
+        if self.pool:
+            self.pool.submit(self._work, snap)
+        else:
+            threading.Thread(target=self._work, args=(snap,), daemon=True).start()
 
-        feat = self.extract(h, len(h))
-        probs = self.model.predict_proba([feat])[0]
+    def _work(self, h):
 
-        if probs[1] > probs[0]:
-            return "BIG", probs[1]
-        else:
-            return "SMALL", probs[0]
+        while h is not None:
+
+            try:
+                self.fit(h)
+            except Exception as e:
+                # The live model keeps serving; the next submit tries again
+                METRICS.inc("perfectx_retrain_errors_total", feed=self.feed, error=type(e).__name__)
+                self.log(f"RETRAIN FAILED : {type(e).__name__}: {e}")
+
+            with self.lock:
+                h, self.pending = self.pending, None
+                if h is None:
+                    self.busy = False
 
 # =====================================================
-# MARKOV CORE
+# PERFECT X AI (MODIFIED FOR FLASK STATE)
 # =====================================================
 
-class MarkovCore:
+class PerfectXAI:
 
-    def __init__(self):
-        self.chain = defaultdict(lambda: {"BIG": 0, "SMALL": 0})
+    # pub: Publisher of the state the dashboard reads (a private one when None)
+    # store: HistoryStore to persist draws to, or None
+    # background: retrain on a worker thread instead of inline
+    # log: where the NEXT/PREDICT lines go
+    # url, session: the feed's history endpoint and a shared HTTP session
+    # pool: executor for retrains, shared between feeds
+    # model_path: where the fitted AiCore is kept across restarts, or None
+    # feed: name the metrics are labelled with
+    # events: EventLog every decision and resolution is appended to, or None
+
+    def __init__(self, pub=None, store=None, background=True, log=print,
+                 url=None, session=None, pool=None, model_path=None,
+                 feed=DEFAULT_FEED, events=None):
+
+        self.pub = Publisher(new_state()) if pub is None else pub
+        self.state = self.pub.state
+        self.log = log
+        self.feed = feed
+
+        # Timers bound once, so the poll loop never builds label keys
+        self.stage = {
+            s: METRICS.histogram("perfectx_stage_seconds", feed=feed, stage=s)
+            for s in ("poll", "ingest", "anomaly", "vote")
+        }
+        self.retrain_time = METRICS.histogram("perfectx_retrain_seconds", feed=feed)
 
-    def train(self, h):
+        self.dm = DataManager(store, url, session, feed)
 
-        self.chain.clear()
+        # Row numbers carry on from the persistent log across restarts
+        if store:
+            self.pub.archive = store
+            self.pub.seq = store.last_seq()
+            self.state["history_seq"] = self.pub.seq
+            self.state["history_from"] = self.pub.seq + 1
+        self.voters = {name: factory() for name, factory in VOTERS.items()}
+        self.anomaly = AnomalyDetector()
+        self.jarvis = Jarvis()
 
-        for i in range(3, len(h)):
-            k = (h[i-3]["res"], h[i-2]["res"], h[i-1]["res"])
-            self.chain[k][h[i]["res"]] += 1
+        # Every model but "ai" is fed draw by draw; hooks bound once, in
+        # registry order with the anomaly detector last
+        models = [m for name, m in self.voters.items() if name != "ai"] + [self.anomaly]
+        self.trains = [m.train for m in models if hasattr(m, "train")]
+        self.updates = [m.update for m in models if hasattr(m, "update")]
+        self.evicts = [m.evict for m in models if hasattr(m, "evict")]
+        self.ensemble = Ensemble(self, background)
+        self.events = events
+        self.trainer = Trainer(self.swap_models, background, pool, lambda: self.ai, feed, log)
+        self.model_path = model_path
+        self.poller = Poller()
 
-    def predict(self, h):
+        self.last_id = None
+        self.active_pred = None
+        self.active_issue = None
 
-        if len(h) < 3:
-            return "WAIT", 0
+    @property
+    def ai(self):
+        return self.voters["ai"]
 
-        k = (h[-3]["res"], h[-2]["res"], h[-1]["res"])
+    def swap_models(self, ai, took):
 
-        stats = self.chain.get(k, {"BIG": 0, "SMALL": 0})
-        total = stats["BIG"] + stats["SMALL"]
+        # A plain item rebind, so the poll loop sees either the old
+        # model or the new one, never a half-fitted one
+        if ai.trained or not self.ai.trained:
+            self.voters["ai"] = ai
 
-        if total < 4:
-            return "WAIT", 0
+        if ai.trained and self.model_path:
+            try:
+                ai.save(self.model_path)
+            except Exception as e:
+                METRICS.inc("perfectx_model_save_errors_total", feed=self.feed, error=type(e).__name__)
+                self.log(f"MODEL SAVE FAILED : {type(e).__name__}: {e}")
 
-        p = stats["BIG"] / total
+        self.retrain_time.observe(took)
 
-        if p > 0.5:
-            return "BIG", p
-        elif p < 0.5:
-            return "SMALL", 1-p
+        # Runs on a training thread: wait out any half-applied poll
+        with self.pub.lock:
+            self.state["model_version"] += 1
+            self.state["last_train_ms"] = round(took * 1000)
+            self.pub.publish()
 
-        return "WAIT", 0
+    def ingest(self, cid, num):
 
-# =====================================================
-# DEEP PATTERN
-# =====================================================
+        # Streaming models see each draw enter and leave the window
+        h = self.dm.history
 
-class DeepPattern:
+        with self.stage["ingest"]:
 
-    def predict(self, h):
+            if h.full():
+                for evict in self.evicts:
+                    evict(h)
 
-        if len(h) < 20:
-            return "WAIT", 0
+            self.dm.add(cid, num)
 
-        s = "".join("B" if x["res"] == "BIG" else "S" for x in h)
+            for update in self.updates:
+                update(h)
 
-        best = "WAIT"
-        best_conf = 0
+    def warm_up(self):
 
-        for depth in range(6, 2, -1):
+        # Fit every model on whatever dm.history holds now. A saved AiCore
+        # serves straight away and is caught up by a retrain in the background.
+        h = self.dm.history
 
-            cur = s[-depth:]
-            matches = []
+        if not self.ai.trained and self.model_path:
+            ai = load_model(self.model_path)
+            if ai:
+                self.voters["ai"] = ai
+                self.log(f"MODEL LOADED : {self.model_path} @ {str(ai.cursor)[-4:]}")
 
-            for i in range(len(s)-depth):
-                if s[i:i+depth] == cur and i+depth < len(s):
-                    matches.append(s[i+depth])
+        if not self.ai.trained:
+            self.trainer.fit(h, full=True)
+        elif self.ai.cursor != int(h.ids[-1]):
+            self.trainer.submit(h)
 
-            if len(matches) >= 3:
-                c = Counter(matches)
-                top = c.most_common(1)[0]
-                conf = top[1] / len(matches)
+        for train in self.trains:
+            train(h)
 
-                if conf > best_conf:
-                    best_conf = conf
-                    best = "BIG" if top[0] == "B" else "SMALL"
+        self.last_id = self.dm.history[-1]["id"]
 
-        return best, best_conf
+    def record(self, res):
 
-# =====================================================
-# ANOMALY DETECTOR
-# =====================================================
+        row = self.pub.add_row({
+            "period": self.active_issue[-4:],
+            "pred": self.active_pred,
+            "res": res
+        })
+        self.state["history_seq"] = row["seq"]
 
-class AnomalyDetector:
+    def resolve(self, res):
 
-    def check(self, h):
+        # Settle the active prediction against the drawn result;
+        # returns "WIN", "LOSS" or None when nothing was at stake
+        if not self.active_pred or self.active_pred == "SKIP":
+            if self.events and self.active_pred == "SKIP":
+                self.events.resolve(self.active_issue, res, "SKIP")
+            return None
 
-        if len(h) < 20:
-            return False
+        state = self.state
 
-        nums = [x["n"] for x in h[-20:]]
+        if self.active_pred == res:
+            self.log(f"NEXT : {self.active_issue[-4:]} PREDICT ⏩ : {self.active_pred} ⏳WIN✅✅")
+            METRICS.inc("perfectx_results_total", feed=self.feed, result="win")
+            self.jarvis.resolve(True)
 
-        for i in range(len(nums)-2):
-            if nums[i] == nums[i+1] == nums[i+2]:
-                return True
+            state["wins"] += 1
+            state["current_win_streak"] += 1
+            state["current_loss_streak"] = 0
+            state["max_win_streak"] = max(state["max_win_streak"], state["current_win_streak"])
 
-        c = Counter(nums)
+            self.record("WIN")
+            if self.events:
+                self.events.resolve(self.active_issue, res, "WIN")
 
-        if c.most_common(1)[0][1] > 6:
-            return True
+            # 20 WINS RESET LOGIC
+            if state["wins"] >= 20:
+                reset_stats(state)
 
-        return False
+            return "WIN"
 
-# =====================================================
-# JARVIS BALANCED
-# =====================================================
+        self.log(f"NEXT : {self.active_issue[-4:]} PREDICT ⏩ : {self.active_pred} ⏳LOS❌❌")
+        METRICS.inc("perfectx_results_total", feed=self.feed, result="loss")
+        self.jarvis.resolve(False)
 
-class Jarvis:
+        state["losses"] += 1
+        state["current_loss_streak"] += 1
+        state["current_win_streak"] = 0
+        state["max_loss_streak"] = max(state["max_loss_streak"], state["current_loss_streak"])
 
-    def __init__(self):
+        self.record("LOSS")
+        if self.events:
+            self.events.resolve(self.active_issue, res, "LOSS")
 
-        self.loss_streak = 0
-        self.ai_weight = 1.4
+        return "LOSS"
 
-    def resolve(self, win):
+    def decide(self, next_id):
 
-        if win:
-            self.loss_streak = max(0, self.loss_streak-1)
-            self.ai_weight *= 1.01
+        state = self.state
+        state["current_period"] = next_id[-4:]
+        skip = None
+        ballot = []
+        conf = 0
+        required = self.jarvis.required_conf()
+
+        with self.stage["anomaly"]:
+            state["anomaly"] = self.anomaly.check(self.dm.history)
+
+        if state["anomaly"]:
+            final = "SKIP"
+            skip = "anomaly"
         else:
-            self.loss_streak += 1
-            self.ai_weight *= 0.99
+            ballot = self.ensemble.run(self.dm.history)
 
-        self.ai_weight = max(0.9, min(1.8, self.ai_weight))
+            with self.stage["vote"]:
 
-    def required_conf(self):
+                votes = {"BIG":0,"SMALL":0}
+                w = 0
 
-        if self.loss_streak == 0:
-            return BASE_CONF
-        elif self.loss_streak == 1:
-            return BASE_CONF + 0.04
+                for name, (p, c) in ballot:
+                    if p!="WAIT":
+                        weight = self.jarvis.weight(name)
+                        votes[p]+=c*weight
+                        w += weight
+
+                if w == 0:
+                    final="SKIP"
+                    conf=0
+                    skip = "no_votes"
+                else:
+                    final="BIG" if votes["BIG"]>votes["SMALL"] else "SMALL"
+                    conf=votes[final]/w
+
+                if final!="SKIP" and conf<required:
+                    final="SKIP"
+                    skip = "low_conf"
+
+        if skip:
+            METRICS.inc("perfectx_skips_total", feed=self.feed, reason=skip)
+
+        self.active_pred = final
+        self.active_issue = next_id
+
+        if self.events:
+            self.events.decide(next_id, final, conf, required, ballot, state["anomaly"])
+
+        if final != "SKIP":
+            state["current_prediction"] = final
+            self.log(f"NEXT : {next_id[-4:]} PREDICT ⏩ : {final} ⏳WATINGG")
         else:
-            return BASE_CONF + 0.08
+            state["current_prediction"] = "ANALYZING..."
+            self.log(f"NEXT : {next_id[-4:]} PREDICT ⏩ : SKIP ⏳WATINGG")
 
-# =====================================================
-# PERFECT X AI (MODIFIED FOR FLASK STATE)
-# =====================================================
+    def backfill(self, cid):
 
-class PerfectXAI:
+        # Issues between last_id and cid were missed. Fetch them in one
+        # request and feed them through in order, so the prediction made
+        # for the first of them is settled against its own result.
+        first = int(self.last_id) + 1
+        got = {}
 
-    def __init__(self):
+        try:
+            for d in self.dm.recent(int(cid) - first + 1):
+                got[int(d["issueNumber"])] = int(d["number"])
+        except Exception as e:
+            # Whatever did not arrive is voided below
+            METRICS.inc("perfectx_api_errors_total", feed=self.feed, error=type(e).__name__)
 
-        self.dm = DataManager()
-        self.ai = AiCore()
-        self.mk = MarkovCore()
-        self.dp = DeepPattern()
-        self.anomaly = AnomalyDetector()
-        self.jarvis = Jarvis()
+        for issue in range(first, int(cid)):
 
-        self.last_id = None
+            num = got.get(issue)
+
+            if str(issue) == self.active_issue:
+                if num is None:
+                    self.void()
+                else:
+                    self.resolve("BIG" if num >= 5 else "SMALL")
+                self.active_pred = None
+
+            if num is not None:
+                self.ingest(str(issue), num)
+                if issue % RETRAIN_EVERY == 0:
+                    self.trainer.submit(self.dm.history)
+                self.last_id = str(issue)
+
+    def void(self):
+
+        # The result for the active prediction never arrived: no win, no loss
+        if self.active_pred and self.active_pred != "SKIP":
+            self.log(f"NEXT : {self.active_issue[-4:]} PREDICT ⏩ : {self.active_pred} ⏳VOID")
+            METRICS.inc("perfectx_results_total", feed=self.feed, result="void")
+        if self.events and self.active_pred:
+            self.events.resolve(self.active_issue, None, "VOID")
         self.active_pred = None
-        self.active_issue = None
 
-    def start(self):
+    def resync(self):
 
-        APP_STATE["status"] = "SYNCING DATA..."
-        print("PERFECT X AI BALANCED MODE STARTING...")
+        # Too far behind to backfill: reload history and refit everything
+        self.void()
 
-        if not self.dm.sync():
-            APP_STATE["status"] = "SYNC FAILED"
-            print("SYNC FAILED")
-            return
+        if self.dm.sync():
+            self.warm_up()
+            self.decide(str(int(self.last_id)+1))
+            self.pub.publish()
 
-        APP_STATE["status"] = "TRAINING MODELS..."
-        self.ai.train(self.dm.history)
-        self.mk.train(self.dm.history)
+    def on_draw(self, cid, num):
 
-        self.last_id = self.dm.history[-1]["id"]
-        
-        APP_STATE["status"] = "RUNNING AND ANALYZING"
-        print("RUNNING...\n")
+        # One new issue: resolve, learn from it, predict the next one
+        outcome = self.resolve("BIG" if num >= 5 else "SMALL")
 
-        while True:
+        # Update DataManager History (and the on-disk store)
+        self.ingest(cid, num)
 
-            try:
+        if int(cid) % RETRAIN_EVERY == 0:
+            self.trainer.submit(self.dm.history)
+
+        self.decide(str(int(cid)+1))
+        self.last_id = cid
+        self.pub.publish()
+
+        return outcome
+
+    def set_status(self, status):
+
+        with self.pub.lock:
+            self.state["status"] = status
+            self.pub.publish()
+
+    def prepare(self):
+
+        METRICS.gauge(
+            "perfectx_last_issue_age_seconds",
+            lambda: None if self.poller.seen_at is None else round(time.monotonic() - self.poller.seen_at, 3),
+            feed=self.feed
+        )
+
+        self.log("PERFECT X AI BALANCED MODE STARTING...")
+        startup = self.state["startup"]
+
+        # Whatever the store holds is enough to start predicting; the first
+        # poll backfills (or resyncs) up to the live issue
+        if not self.dm.restore():
+            self.set_status("SYNCING DATA...")
+            if not self.dm.sync():
+                self.set_status("SYNC FAILED")
+                self.log("SYNC FAILED")
+                return False
+
+        with self.pub.lock:
+            mark(startup, "history")
+
+        self.set_status("TRAINING MODELS...")
+        self.warm_up()
 
-                r = requests.get(API_URL,
-                                 params={"size":"1","pageNo":"1"},
-                                 timeout=5)
+        with self.pub.lock:
+            mark(startup, "models")
+            self.state["ready"] = True
+            self.set_status("RUNNING AND ANALYZING")
+        self.log("RUNNING...\n")
+        return True
 
-                d = r.json()["data"]["list"][0]
+    def poll(self):
 
+        # One look at the feed; returns the seconds until the next is due
+        sent = time.monotonic()
+
+        try:
+            with self.stage["poll"]:
+                d = self.dm.latest()
                 cid = str(d["issueNumber"])
                 num = int(d["number"])
-                res = "BIG" if num >= 5 else "SMALL"
-
-                if cid != self.last_id:
-
-                    # Resolve previous prediction
-                    if self.active_pred and self.active_pred != "SKIP":
-
-                        if self.active_pred == res:
-                            print(f"NEXT : {self.active_issue[-4:]} PREDICT ⏩ : {self.active_pred} ⏳WIN✅✅")
-                            self.jarvis.resolve(True)
-                            
-                            APP_STATE["wins"] += 1
-                            APP_STATE["current_win_streak"] += 1
-                            APP_STATE["current_loss_streak"] = 0
-                            APP_STATE["max_win_streak"] = max(APP_STATE["max_win_streak"], APP_STATE["current_win_streak"])
-                            
-                            APP_STATE["history"].insert(0, {
-                                "period": self.active_issue[-4:],
-                                "pred": self.active_pred,
-                                "res": "WIN"
-                            })
-                            
-                            # 20 WINS RESET LOGIC
-                            if APP_STATE["wins"] >= 20:
-                                reset_stats()
-
-                        else:
-                            print(f"NEXT : {self.active_issue[-4:]} PREDICT ⏩ : {self.active_pred} ⏳LOS❌❌")
-                            self.jarvis.resolve(False)
-                            
-                            APP_STATE["losses"] += 1
-                            APP_STATE["current_loss_streak"] += 1
-                            APP_STATE["current_win_streak"] = 0
-                            APP_STATE["max_loss_streak"] = max(APP_STATE["max_loss_streak"], APP_STATE["current_loss_streak"])
-                            
-                            APP_STATE["history"].insert(0, {
-                                "period": self.active_issue[-4:],
-                                "pred": self.active_pred,
-                                "res": "LOSS"
-                            })
-                            
-                    # Keep history concise
-                    if len(APP_STATE["history"]) > 50:
-                        APP_STATE["history"] = APP_STATE["history"][:50]
-
-                    # Update DataManager History
-                    self.dm.history.append({
-                        "id": cid,
-                        "n": num,
-                        "res": res
-                    })
-
-                    if len(self.dm.history) > HISTORY_LIMIT:
-                        self.dm.history.pop(0)
-
-                    if int(cid) % 5 == 0:
-                        self.ai.train(self.dm.history)
-                        self.mk.train(self.dm.history)
-
-                    next_id = str(int(cid)+1)
-                    APP_STATE["current_period"] = next_id[-4:]
-
-                    if self.anomaly.check(self.dm.history):
-                        self.active_pred = "SKIP"
-                        self.active_issue = next_id
-                        APP_STATE["current_prediction"] = "ANALYZING..."
-                        print(f"NEXT : {next_id[-4:]} PREDICT ⏩ : SKIP ⏳WATINGG")
-                        self.last_id=cid
-                        continue
-
-                    ai_p, ai_c = self.ai.predict(self.dm.history)
-                    mk_p, mk_c = self.mk.predict(self.dm.history)
-                    dp_p, dp_c = self.dp.predict(self.dm.history)
-
-                    votes = {"BIG":0,"SMALL":0}
-                    w = 0
-
-                    if ai_p!="WAIT":
-                        votes[ai_p]+=ai_c*self.jarvis.ai_weight
-                        w += self.jarvis.ai_weight
-
-                    if mk_p!="WAIT":
-                        votes[mk_p]+=mk_c
-                        w += 1
-
-                    if dp_p!="WAIT":
-                        votes[dp_p]+=dp_c
-                        w += 1
-
-                    if w == 0:
-                        final="SKIP"
-                        conf=0
-                    else:
-                        final="BIG" if votes["BIG"]>votes["SMALL"] else "SMALL"
-                        conf=votes[final]/w
-
-                    req=self.jarvis.required_conf()
-
-                    if final!="SKIP" and conf>=req:
-                        self.active_pred = final
-                        self.active_issue = next_id
-                        APP_STATE["current_prediction"] = final
-                        print(f"NEXT : {next_id[-4:]} PREDICT ⏩ : {final} ⏳WATINGG")
-                    else:
-                        self.active_pred = "SKIP"
-                        self.active_issue = next_id
-                        APP_STATE["current_prediction"] = "ANALYZING..."
-                        print(f"NEXT : {next_id[-4:]} PREDICT ⏩ : SKIP ⏳WATINGG")
-
-                    self.last_id=cid
-
-                time.sleep(1)
+        except Exception as e:
+            METRICS.inc("perfectx_api_errors_total", feed=self.feed, error=type(e).__name__)
+            self.poller.failed()
+            return self.poller.delay()
+
+        try:
+
+            # Other writers (a finished retrain) publish only between draws
+            with self.pub.lock:
+
+                jump = int(cid) - int(self.last_id)
+
+                if jump > BACKFILL_MAX:
+                    self.poller.changed(jump, sent)
+                    self.resync()
+                elif jump > 0:
+                    self.poller.changed(jump, sent)
+                    if jump > 1:
+                        self.backfill(cid)
+                    self.on_draw(cid, num)
+
+                self.poller.ok()
+
+                if self.state["startup"]["live"] is None:
+                    mark(self.state["startup"], "live")
+                    self.pub.publish()
+
+        except Exception as e:
+            METRICS.inc("perfectx_loop_errors_total", feed=self.feed, error=type(e).__name__)
+            self.poller.failed()
 
+        return self.poller.delay()
+
+    def start(self):
+
+        if not self.prepare():
+            return
+
+        while True:
+
+            try:
+                time.sleep(self.poll())
             except KeyboardInterrupt:
                 print("STOPPED")
                 break
-            except Exception as e:
-                time.sleep(2)
+
+# =====================================================
+# ENGINE (MANY FEEDS ON A FEW SHARED THREADS)
+# =====================================================
+
+class Engine:
+
+    # Keeps every feed's next poll on one heap; a scheduler thread hands
+    # each due poll to a small pool, so idle feeds hold no thread at all.
+
+    def __init__(self, bots, workers=FEED_WORKERS):
+
+        self.bots = bots
+        self.ready = [False] * len(bots)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+
+        self.cond = threading.Condition()
+        self.due = [(0, i) for i in range(len(bots))]
+
+    def step(self, i):
+
+        bot = self.bots[i]
+        delay = BACKOFF_MAX
+
+        try:
+            if self.ready[i]:
+                delay = bot.poll()
+            elif bot.prepare():
+                self.ready[i] = True
+                delay = 0
+        except Exception as e:
+            stage = "loop" if self.ready[i] else "startup"
+            METRICS.inc(f"perfectx_{stage}_errors_total", feed=bot.feed, error=type(e).__name__)
+            bot.log(f"{stage.upper()} ERROR : {type(e).__name__}: {e}")
+
+        with self.cond:
+            heapq.heappush(self.due, (time.monotonic() + delay, i))
+            self.cond.notify()
+
+    def run(self):
+
+        while True:
+
+            with self.cond:
+                while not self.due or self.due[0][0] > time.monotonic():
+                    self.cond.wait(self.due[0][0] - time.monotonic() if self.due else None)
+                _, i = heapq.heappop(self.due)
+
+            self.pool.submit(self.step, i)
 
 
 # =====================================================
@@ -506,6 +2222,7 @@ HTML_TEMPLATE = """
         th { color: var(--text-muted); font-size: 0.9rem; text-transform: uppercase; }
         .res-WIN { color: var(--win-color); font-weight: bold; }
         .res-LOSS { color: var(--loss-color); font-weight: bold; }
+        .older { margin-top: 15px; background: none; border: 1px solid #334155; color: var(--text-muted); padding: 8px 16px; border-radius: 8px; cursor: pointer; }
         
         @media (max-width: 600px) {
             header h1 { font-size: 2rem; }
@@ -566,72 +2283,356 @@ HTML_TEMPLATE = """
                 <tbody id="ui-history">
                     </tbody>
             </table>
+            <button class="older" onclick="loadOlder()">Load older</button>
         </div>
     </div>
 
     <script>
-        function updateUI() {
-            fetch('/api/state')
+        function render(data) {
+            document.getElementById('system-status').innerText = data.status;
+            document.getElementById('ui-period').innerText = data.current_period;
+            
+            const predEl = document.getElementById('ui-prediction');
+            predEl.innerText = data.current_prediction;
+            predEl.className = 'pred-value'; 
+            if(data.current_prediction === 'BIG') predEl.classList.add('pred-BIG');
+            else if(data.current_prediction === 'SMALL') predEl.classList.add('pred-SMALL');
+            else predEl.classList.add('pred-ANALYZING');
+
+            document.getElementById('ui-wins').innerText = data.wins;
+            document.getElementById('ui-losses').innerText = data.losses;
+            document.getElementById('ui-c-win').innerText = data.current_win_streak;
+            document.getElementById('ui-c-loss').innerText = data.current_loss_streak;
+            document.getElementById('ui-m-win').innerText = data.max_win_streak;
+            document.getElementById('ui-m-loss').innerText = data.max_loss_streak;
+
+            syncHistory(data);
+        }
+
+        // History rows are fetched as deltas by sequence number and
+        // added to the table, never re-sent or rebuilt in full
+        const HISTORY_PAGE = {{ history_page }};
+        const FEED = {{ feed_path|tojson }};
+        let lastSeq = null;
+        let loadingHistory = false;
+
+        function historyRow(item) {
+            const tr = document.createElement('tr');
+            tr.dataset.seq = item.seq;
+            tr.innerHTML = `
+                <td>${item.period}</td>
+                <td>${item.pred}</td>
+                <td class="res-${item.res}">${item.res}</td>
+            `;
+            return tr;
+        }
+
+        function syncHistory(data) {
+            const tbody = document.getElementById('ui-history');
+
+            // Stats reset: rows from before it are no longer "recent"
+            Array.from(tbody.children).forEach(tr => {
+                if (+tr.dataset.seq < data.history_from) tr.remove();
+            });
+            if (lastSeq === null || lastSeq < data.history_from - 1) lastSeq = data.history_from - 1;
+
+            if (data.history_seq <= lastSeq || loadingHistory) return;
+            loadingHistory = true;
+
+            // More than a page behind: start over from the newest page
+            // rather than paging forward through everything missed
+            const behind = data.history_seq - lastSeq > HISTORY_PAGE;
+            const url = behind
+                ? `/api/history${FEED}?before=${data.history_seq + 1}&limit=${HISTORY_PAGE}`
+                : `/api/history${FEED}?since=${lastSeq}&limit=${HISTORY_PAGE}`;
+
+            fetch(url)
                 .then(res => res.json())
-                .then(data => {
-                    document.getElementById('system-status').innerText = data.status;
-                    document.getElementById('ui-period').innerText = data.current_period;
-                    
-                    const predEl = document.getElementById('ui-prediction');
-                    predEl.innerText = data.current_prediction;
-                    predEl.className = 'pred-value'; 
-                    if(data.current_prediction === 'BIG') predEl.classList.add('pred-BIG');
-                    else if(data.current_prediction === 'SMALL') predEl.classList.add('pred-SMALL');
-                    else predEl.classList.add('pred-ANALYZING');
-
-                    document.getElementById('ui-wins').innerText = data.wins;
-                    document.getElementById('ui-losses').innerText = data.losses;
-                    document.getElementById('ui-c-win').innerText = data.current_win_streak;
-                    document.getElementById('ui-c-loss').innerText = data.current_loss_streak;
-                    document.getElementById('ui-m-win').innerText = data.max_win_streak;
-                    document.getElementById('ui-m-loss').innerText = data.max_loss_streak;
-
-                    const tbody = document.getElementById('ui-history');
-                    tbody.innerHTML = '';
-                    data.history.forEach(item => {
-                        const tr = document.createElement('tr');
-                        tr.innerHTML = `
-                            <td>${item.period}</td>
-                            <td>${item.pred}</td>
-                            <td class="res-${item.res}">${item.res}</td>
-                        `;
-                        tbody.appendChild(tr);
+                .then(page => {
+                    if (behind) {
+                        tbody.replaceChildren();
+                        page.rows.forEach(item => {
+                            if (item.seq >= data.history_from) tbody.appendChild(historyRow(item));
+                        });
+                        lastSeq = data.history_seq;
+                        return;
+                    }
+                    page.rows.forEach(item => {
+                        if (item.seq <= lastSeq) return;
+                        tbody.insertBefore(historyRow(item), tbody.firstChild);
+                        lastSeq = item.seq;
                     });
                 })
+                .catch(err => console.error("Error fetching history:", err))
+                .finally(() => { loadingHistory = false; });
+        }
+
+        function loadOlder() {
+            const tbody = document.getElementById('ui-history');
+            const last = tbody.lastElementChild;
+            const before = last ? +last.dataset.seq : (lastSeq || 0) + 1;
+
+            fetch(`/api/history${FEED}?before=${before}&limit=${HISTORY_PAGE}`)
+                .then(res => res.json())
+                .then(page => page.rows.forEach(item => tbody.appendChild(historyRow(item))))
+                .catch(err => console.error("Error fetching history:", err));
+        }
+
+        // Fallback when EventSource is unavailable: conditional polling,
+        // unchanged state comes back as 304 and is not re-rendered
+        let etag = null;
+        function updateUI() {
+            fetch(`/api/state${FEED}`, { headers: etag ? { 'If-None-Match': etag } : {} })
+                .then(res => {
+                    if (res.status === 304) return null;
+                    etag = res.headers.get('ETag');
+                    return res.json();
+                })
+                .then(data => { if (data) render(data); })
                 .catch(err => console.error("Error fetching state:", err));
         }
 
-        setInterval(updateUI, 1000);
-        updateUI();
+        if (window.EventSource) {
+            const events = new EventSource(`/api/events${FEED}`);
+            events.onmessage = e => render(JSON.parse(e.data));
+        } else {
+            setInterval(updateUI, 1000);
+            updateUI();
+        }
     </script>
 </body>
 </html>
 """
 
+def publisher(feed):
+
+    if feed not in PUBLISHERS:
+        abort(404)
+    return PUBLISHERS[feed]
+
 @app.route("/")
-def index():
-    return render_template_string(HTML_TEMPLATE)
+@app.route("/feed/<feed>")
+def index(feed=DEFAULT_FEED):
+
+    publisher(feed)
+    feed_path = "" if feed == DEFAULT_FEED else "/" + feed
+    return render_template_string(HTML_TEMPLATE, history_page=HISTORY_PAGE, feed_path=feed_path)
+
+@app.route("/api/feeds")
+def get_feeds():
+    return jsonify(list(FEEDS))
 
 @app.route("/api/state")
-def get_state():
-    return jsonify(APP_STATE)
+@app.route("/api/state/<feed>")
+def get_state(feed=DEFAULT_FEED):
+
+    # The body was encoded once when this version was published
+    version, body = publisher(feed).encoded()
+    etag = f'"{version}"'
+
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status=304, headers={"ETag": etag})
+
+    return Response(body, mimetype="application/json",
+                    headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+@app.route("/api/history")
+@app.route("/api/history/<feed>")
+def get_history(feed=DEFAULT_FEED):
+
+    pub = publisher(feed)
+    limit = max(0, min(request.args.get("limit", HISTORY_PAGE, type=int), HISTORY_ROWS))
+    rows = pub.history(
+        request.args.get("since", type=int),
+        request.args.get("before", type=int),
+        limit
+    )
+
+    _, state = pub.snapshot()
+
+    return jsonify({
+        "rows": rows,
+        "history_seq": state["history_seq"],
+        "history_from": state["history_from"]
+    })
+
+@app.route("/api/events")
+@app.route("/api/events/<feed>")
+def state_events(feed=DEFAULT_FEED):
+
+    # Server-Sent Events: one frame per state version, comments to keep idle
+    # connections open. A reconnect resumes from Last-Event-ID.
+    last = request.headers.get("Last-Event-ID")
+    version = int(last) if last and last.isdigit() else None
+    pub = publisher(feed)
+
+    def stream():
+
+        nonlocal version
+
+        while True:
+            v = pub.wait(version, SSE_KEEPALIVE)
+            if v == version:
+                yield ": keepalive\n\n"
+                continue
+            version, body = pub.encoded()
+            yield b"id: %d\ndata: %s\n\n" % (version, body)
+
+    return Response(stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.route("/api/stats")
+@app.route("/api/stats/<feed>")
+def get_stats(feed=DEFAULT_FEED):
+
+    # Hit rates from the event log: ?by=hour|conf|voter&since=&until= (unix time)
+    publisher(feed)
+
+    by = request.args.get("by", "hour")
+    if by not in ("hour", "conf", "voter"):
+        abort(400)
+
+    rows, voters = load_events(feed_file(feed, EVENT_LOG))
+    stats = event_stats(rows, voters, by,
+                        request.args.get("since", type=float),
+                        request.args.get("until", type=float))
+
+    return jsonify({"by": by, "rows": stats})
+
+@app.route("/healthz")
+def healthz():
+
+    # Liveness: the process answers
+    return jsonify({"alive": True, "uptime": round(time.monotonic() - STARTED, 3), "startup": STARTUP})
+
+@app.route("/readyz")
+def readyz():
 
+    # Readiness: every feed has history and models and can predict
+    feeds = {}
+
+    for name, pub in PUBLISHERS.items():
+        _, state = pub.snapshot()
+        feeds[name] = {
+            "ready": state.get("ready", False),
+            "status": state["status"],
+            "startup": state.get("startup")
+        }
+
+    ready = all(f["ready"] for f in feeds.values())
+    body = {"ready": ready, "startup": STARTUP, "feeds": feeds}
+
+    return jsonify(body), 200 if ready else 503
+
+@app.route("/metrics")
+def metrics():
+
+    body = METRICS_MIRROR.load_metrics() if METRICS_MIRROR else METRICS.render()
+    return Response(body, mimetype="text/plain; version=0.0.4")
 
 # =====================================================
 # START
 # =====================================================
 
+def feed_file(name, path):
+
+    # history.db, model.pkl for the default feed; history_30s.db ... for others
+    root, ext = os.path.splitext(path)
+    return path if name == DEFAULT_FEED else f"{root}_{name}{ext}"
+
+def lead(stores):
+
+    # Run every feed's poller and models in this process and publish
+    # through the stores. One HTTP session and one retrain pool serve all.
+    session = http_session(HTTP_POOL, hosts=len(FEEDS))
+    pool = ThreadPoolExecutor(max_workers=TRAIN_WORKERS)
+    bots = []
+
+    for name, url in FEEDS.items():
+        state = APP_STATE if name == DEFAULT_FEED else new_state()
+        PUBLISHERS[name] = Publisher(state, mirror=stores[name])
+        log = print if len(FEEDS) == 1 else (lambda line, name=name: print(f"[{name}] {line}"))
+        bots.append(PerfectXAI(PUBLISHERS[name], stores[name], log=log,
+                               url=url, session=session, pool=pool,
+                               model_path=feed_file(name, MODEL_PATH), feed=name,
+                               events=EventLog(feed_file(name, EVENT_LOG))))
+
+    threading.Thread(target=Engine(bots).run, daemon=True).start()
+
+    def prewarm():
+        # Import sklearn off the request path, before the first retrain needs it
+        new_gbm()
+        mark(STARTUP, "sklearn")
+
+    threading.Thread(target=prewarm, daemon=True).start()
+
+    def export():
+        while True:
+            time.sleep(METRICS_EXPORT)
+            try:
+                stores[DEFAULT_FEED].save_metrics(METRICS.render())
+            except Exception:
+                pass
+
+    threading.Thread(target=export, daemon=True).start()
+
+# The open LEADER_LOCK file. The flock lives as long as this file object,
+# so it is held here for the life of the process, never in a local.
+LEADER_FD = None
+
+def boot():
+
+    # Exactly one process holds LEADER_LOCK and runs the pollers. The rest
+    # serve the dashboard from the shared stores and keep trying the lock,
+    # so a follower takes over if the leader dies.
+    global METRICS_MIRROR, LEADER_FD
+
+    stores = {name: HistoryStore(feed_file(name, HISTORY_DB)) for name in FEEDS}
+    LEADER_FD = open(LEADER_LOCK, "a")
+
+    # fcntl is POSIX only; on Windows lock the file's first byte instead
+    try:
+        import fcntl
+    except ImportError:
+        fcntl = None
+        import msvcrt
+
+    def try_lock():
+        try:
+            if fcntl:
+                fcntl.flock(LEADER_FD, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                LEADER_FD.seek(0)
+                msvcrt.locking(LEADER_FD.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    mark(STARTUP, "boot")
+
+    if try_lock():
+        lead(stores)
+        return True
+
+    for name in FEEDS:
+        PUBLISHERS[name] = SharedState(stores[name])
+    METRICS_MIRROR = stores[DEFAULT_FEED]
+
+    def follow():
+        global METRICS_MIRROR
+        while not try_lock():
+            time.sleep(LEADER_RETRY)
+        print(f"[{os.getpid()}] LEADER GONE, TAKING OVER POLLING")
+        METRICS_MIRROR = None
+        lead(stores)
+
+    threading.Thread(target=follow, daemon=True).start()
+    return False
+
 if __name__=="__main__":
     # Start AI core in background thread
-    ai_bot = PerfectXAI()
-    ai_thread = threading.Thread(target=ai_bot.start)
-    ai_thread.daemon = True 
-    ai_thread.start()
+    boot()
     
     # Start Flask Web Server
     print("===================================================")
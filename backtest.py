@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+
+import sys
+import json
+import time
+import argparse
+import app
+
+# =====================================================
+# LOADING RECORDED DRAWS
+# =====================================================
+
+def load_draws(path):
+
+    # A HistoryStore database, or JSON / JSON-lines holding API records
+    # ({"issueNumber", "number"}) or whole API responses
+    if path.endswith(".db"):
+        return app.HistoryStore(path).load(-1)
+
+    with open(path) as f:
+        text = f.read()
+
+    try:
+        docs = [json.loads(text)]
+    except ValueError:
+        docs = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    raw = {}
+
+    def collect(x):
+        if isinstance(x, list):
+            for i in x:
+                collect(i)
+        elif isinstance(x, dict) and "data" in x:
+            collect(x["data"]["list"])
+        elif isinstance(x, dict) and "issueNumber" in x:
+            raw[int(x["issueNumber"])] = int(x["number"])
+
+    collect(docs)
+
+    return [(k, raw[k]) for k in sorted(raw)]
+
+# =====================================================
+# REPLAY ENGINE
+# =====================================================
+
+class Replay:
+
+    # Feeds recorded draws through PerfectXAI.on_draw, the same path the
+    # live poll loop takes, with retraining inline and no network or sleeps
+
+    # events: optional path of an event log to append every decision to
+
+    def __init__(self, draws, warmup=app.SYNC_PAGES * app.SYNC_PAGE_SIZE, events=None):
+
+        self.draws = draws
+        self.warmup = warmup
+        self.events = events
+
+    def run(self):
+
+        if len(self.draws) <= self.warmup:
+            raise ValueError("need more draws than the warm-up window")
+
+        bot = app.PerfectXAI(background=False, log=lambda *a: None,
+                             events=app.EventLog(self.events) if self.events else None)
+        bot.dm.history.extend(self.draws[:self.warmup])
+        bot.warm_up()
+
+        stats = {
+            "draws": 0,
+            "predictions": 0,
+            "skips": 0,
+            "wins": 0,
+            "losses": 0,
+            "max_win_streak": 0,
+            "max_loss_streak": 0
+        }
+
+        win_streak = loss_streak = 0
+        t = time.perf_counter()
+
+        for issue, num in self.draws[self.warmup:]:
+
+            pending = bot.active_pred
+            outcome = bot.on_draw(str(issue), num)
+
+            stats["draws"] += 1
+
+            if pending == "SKIP":
+                stats["skips"] += 1
+            elif outcome == "WIN":
+                stats["wins"] += 1
+                win_streak += 1
+                loss_streak = 0
+            elif outcome == "LOSS":
+                stats["losses"] += 1
+                loss_streak += 1
+                win_streak = 0
+
+            stats["max_win_streak"] = max(stats["max_win_streak"], win_streak)
+            stats["max_loss_streak"] = max(stats["max_loss_streak"], loss_streak)
+
+        took = time.perf_counter() - t
+
+        stats["predictions"] = stats["wins"] + stats["losses"]
+        stats["hit_rate"] = stats["wins"] / stats["predictions"] if stats["predictions"] else 0
+        stats["skip_rate"] = stats["skips"] / stats["draws"] if stats["draws"] else 0
+        stats["seconds"] = round(took, 3)
+        stats["draws_per_sec"] = round(stats["draws"] / took, 1) if took else 0
+
+        # What the dashboard would show at the end, 20-win resets included
+        stats["state"] = bot.state
+
+        return stats
+
+# =====================================================
+# CLI
+# =====================================================
+
+if __name__=="__main__":
+
+    ap = argparse.ArgumentParser(description="Replay recorded draws through Perfect X AI")
+    ap.add_argument("source", help="history .db file, or JSON / JSON-lines of API records")
+    ap.add_argument("--warmup", type=int, default=app.SYNC_PAGES * app.SYNC_PAGE_SIZE,
+                    help="draws used as the initial synced history")
+    ap.add_argument("--retrain-every", type=int, default=app.RETRAIN_EVERY,
+                    help="refit AiCore when the issue number is a multiple of this")
+    ap.add_argument("--events", help="also append every decision to this event log")
+    ap.add_argument("--json", action="store_true", help="print the full result as JSON")
+    args = ap.parse_args()
+
+    app.RETRAIN_EVERY = args.retrain_every
+    stats = Replay(load_draws(args.source), args.warmup, args.events).run()
+
+    if args.json:
+        json.dump(stats, sys.stdout, indent=2)
+        print()
+        sys.exit(0)
+
+    print("===================================================")
+    print(f" DRAWS      : {stats['draws']}  ({stats['draws_per_sec']}/s)")
+    print(f" PREDICTED  : {stats['predictions']}   SKIPPED : {stats['skips']}")
+    print(f" WIN / LOSS : {stats['wins']} / {stats['losses']}  HIT RATE : {stats['hit_rate']:.3f}")
+    print(f" MAX STREAK : WIN {stats['max_win_streak']}  LOSS {stats['max_loss_streak']}")
+    print("===================================================")
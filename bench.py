@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+import app
+from mock_api import MockApi, serve, synthetic
+
+# =====================================================
+# CONFIG
+# =====================================================
+
+SIZES = (500, 2000, 20000, 200000)
+BASELINE_FILE = "bench_baseline.json"
+TOLERANCE = 0.5      # fail when 50% slower than the stored baseline...
+MIN_DELTA = 50e-6    # ...and at least 50us slower, to ignore timer noise
+MIN_TIME = 0.2       # repeat each case for at least this long
+
+# =====================================================
+# MEASUREMENT
+# =====================================================
+
+def measure(fn):
+
+    # Per-call wall time (best of the repeats), bytes one call leaves allocated
+    # and the call's traced peak
+    tracemalloc.start()
+    fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = float("inf")
+    spent = 0
+    reps = 0
+
+    while spent < MIN_TIME or reps < 3:
+        t = time.perf_counter()
+        fn()
+        took = time.perf_counter() - t
+        best = min(best, took)
+        spent += took
+        reps += 1
+
+    return {"seconds": best, "kept_bytes": current, "peak_bytes": peak, "reps": reps}
+
+def peak_rss_mb():
+
+    # ru_maxrss is KiB on Linux, bytes on macOS; resource is POSIX only,
+    # so the column reads 0 on Windows
+    try:
+        import resource
+    except ImportError:
+        return 0
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+# =====================================================
+# CASES
+# =====================================================
+
+def bench_size(n):
+
+    draws = synthetic(n)
+    h = app.DrawBuffer(n)
+    h.extend(draws)
+
+    ai = app.AiCore()
+    mk = app.MarkovCore()
+    dp = app.DeepPattern()
+    an = app.AnomalyDetector()
+
+    ai.train(h)
+    mk.train(h)
+    dp.train(h)
+    an.train(h)
+
+    start = max(10, len(h) - app.TRAIN_SIZE)
+
+    cases = {
+        "ai.extract": lambda: [ai.extract(h, i) for i in range(start, len(h))],
+        "ai.features": lambda: ai.features(h, start, len(h)),
+        "ai.train": lambda: ai.train(h),
+        "ai.predict": lambda: ai.predict(h),
+        "mk.train": lambda: mk.train(h),
+        "mk.predict": lambda: mk.predict(h),
+        "dp.train": lambda: dp.train(h),
+        "dp.predict": lambda: dp.predict(h),
+        "anomaly.check": lambda: an.check(h),
+    }
+
+    results = {name: measure(fn) for name, fn in cases.items()}
+
+    # One full poll-loop iteration on a non-retrain issue, window full
+    bot = app.PerfectXAI(background=False, log=lambda *a: None)
+    bot.dm.history = app.DrawBuffer(n)
+    bot.dm.history.extend(draws)
+    bot.warm_up()
+
+    nxt = [draws[-1][0] + 1]
+
+    def step():
+        if nxt[0] % app.RETRAIN_EVERY == 0:
+            nxt[0] += 1
+        bot.on_draw(str(nxt[0]), nxt[0] % 10)
+        nxt[0] += 1
+
+    results["loop.on_draw"] = measure(step)
+
+    return results
+
+def bench_sync():
+
+    server, url = serve(MockApi(synthetic(app.SYNC_PAGES * app.SYNC_PAGE_SIZE), speed=0))
+
+    try:
+        return measure(lambda: app.DataManager(url=url).sync())
+    finally:
+        server.shutdown()
+
+# =====================================================
+# REPORT + BASELINES
+# =====================================================
+
+def fmt_time(s):
+
+    if s < 1e-3:
+        return f"{s * 1e6:9.1f} us"
+    if s < 1:
+        return f"{s * 1e3:9.2f} ms"
+    return f"{s:9.3f} s "
+
+def compare(results, baseline):
+
+    failures = []
+
+    for key, r in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if r["seconds"] > base * (1 + TOLERANCE) and r["seconds"] - base > MIN_DELTA:
+            failures.append(f"{key}: {fmt_time(r['seconds']).strip()} vs baseline {fmt_time(base).strip()}")
+
+    return failures
+
+if __name__=="__main__":
+
+    ap = argparse.ArgumentParser(description="Benchmark the per-draw and per-retrain hot paths")
+    ap.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma-separated history sizes")
+    ap.add_argument("--save", action="store_true", help=f"store these timings as the new {BASELINE_FILE}")
+    ap.add_argument("--baseline", default=BASELINE_FILE)
+    args = ap.parse_args()
+
+    results = {}
+
+    print(f"{'case':<24}{'time/call':>14}{'kept':>12}{'peak':>12}{'rss':>10}")
+
+    r = bench_sync()
+    results["sync"] = r
+    print(f"{'sync (mock)':<24}{fmt_time(r['seconds']):>14}{r['kept_bytes'] // 1024:>9} KB"
+          f"{r['peak_bytes'] // 1024:>9} KB{peak_rss_mb():>7.0f} MB")
+
+    for n in (int(x) for x in args.sizes.split(",")):
+        for name, r in bench_size(n).items():
+            key = f"{n}/{name}"
+            results[key] = r
+            print(f"{key:<24}{fmt_time(r['seconds']):>14}{r['kept_bytes'] // 1024:>9} KB"
+                  f"{r['peak_bytes'] // 1024:>9} KB{peak_rss_mb():>7.0f} MB")
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump({k: r["seconds"] for k, r in results.items()}, f, indent=2, sort_keys=True)
+        print(f"\nbaseline saved to {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        print(f"\nno {args.baseline} yet, run with --save to record one")
+        sys.exit(0)
+
+    with open(args.baseline) as f:
+        failures = compare(results, json.load(f))
+
+    if failures:
+        print("\nREGRESSIONS:")
+        for line in failures:
+            print("  " + line)
+        sys.exit(1)
+
+    print("\nno regressions against", args.baseline)
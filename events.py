@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+import sys
+import json
+import time
+import argparse
+import numpy as np
+import app
+
+# =====================================================
+# QUERIES
+# =====================================================
+
+def summary(rows):
+
+    # Decisions and resolutions by kind, outcome and predicted side
+    decided = rows[rows["kind"] == app.EV_DECIDE]
+    resolved = rows[rows["kind"] == app.EV_RESOLVE]
+
+    outcomes = np.bincount(resolved["outcome"], minlength=len(app.OUTCOMES))
+    wins, losses = int(outcomes[1]), int(outcomes[2])
+
+    return {
+        "records": len(rows),
+        "decisions": len(decided),
+        "skips": int((decided["pred"] < 0).sum()),
+        "anomaly_skips": int((decided["anomaly"] > 0).sum()),
+        "outcomes": {name: int(n) for name, n in zip(app.OUTCOMES[1:], outcomes[1:])},
+        "hit_rate": round(wins / (wins + losses), 4) if wins + losses else None,
+        "first": float(rows["ts"][0]) if len(rows) else None,
+        "last": float(rows["ts"][-1]) if len(rows) else None
+    }
+
+def tail(rows, voters, n):
+
+    names = {v: k for k, v in app.SIDES.items()}
+
+    for r in rows[-n:]:
+        kind = "DECIDE " if r["kind"] == app.EV_DECIDE else "RESOLVE"
+        pred = names.get(int(r["pred"]), "SKIP")
+        ballot = " ".join(
+            f"{name}={names.get(int(r['sides'][i]), 'WAIT')}:{r['confs'][i]:.2f}"
+            for i, name in enumerate(voters)
+        )
+        print(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(r['ts']))}  {kind}  "
+              f"{r['issue']}  {pred:<5} conf {r['conf']:.3f} / {r['required']:.3f}  "
+              f"{app.OUTCOMES[r['outcome']]:<7} {ballot}")
+
+# =====================================================
+# CLI
+# =====================================================
+
+if __name__=="__main__":
+
+    ap = argparse.ArgumentParser(description="Query a Perfect X AI event log")
+    ap.add_argument("log", nargs="?", default=app.EVENT_LOG)
+    ap.add_argument("--by", choices=("summary", "hour", "conf", "voter"), default="summary",
+                    help="hit rate by hour of day (UTC), confidence bucket or voter")
+    ap.add_argument("--hours", type=float, help="only the last this many hours")
+    ap.add_argument("--tail", type=int, help="print the last N records instead")
+    ap.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = ap.parse_args()
+
+    rows, voters = app.load_events(args.log)
+
+    if args.hours:
+        rows = rows[np.searchsorted(rows["ts"], time.time() - args.hours * 3600):]
+
+    if args.tail:
+        tail(rows, voters, args.tail)
+        sys.exit(0)
+
+    if args.by == "summary":
+        result = summary(rows)
+    else:
+        result = app.event_stats(rows, voters, args.by)
+
+    if args.json:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+        sys.exit(0)
+
+    if args.by == "summary":
+        for k, v in result.items():
+            print(f"{k:<14} {v}")
+        sys.exit(0)
+
+    print(f"{args.by:<12}{'predictions':>12}{'wins':>8}{'hit rate':>10}")
+    for r in result:
+        rate = "-" if r["hit_rate"] is None else f"{r['hit_rate']:.3f}"
+        print(f"{str(r['bucket']):<12}{r['predictions']:>12}{r['wins']:>8}{rate:>10}")
@@ -0,0 +1,9 @@
+import multiprocessing
+
+wsgi_app = "wsgi:app"
+bind = "0.0.0.0:5000"
+
+# Threaded workers so open /api/events streams don't pin a whole process
+workers = multiprocessing.cpu_count() * 2 + 1
+worker_class = "gthread"
+threads = 32
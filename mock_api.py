@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import numpy as np
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# =====================================================
+# CONFIG
+# =====================================================
+
+FIRST_ISSUE = 20240000000
+PERIOD = 60          # seconds per issue on the real feed
+HANG = 8             # seconds an injected timeout holds the request open
+API_PATH = "/api/get_history"
+
+# Clock-driven constants in app.py the harness divides by its speed-up
+SCALED = ("POLL_PERIOD", "POLL_LEAD", "POLL_FAST", "POLL_IDLE", "BACKOFF_BASE", "BACKOFF_MAX")
+
+# =====================================================
+# DRAWS
+# =====================================================
+
+def synthetic(n, seed=0):
+
+    nums = np.random.default_rng(seed).integers(0, 10, n)
+    return list(zip(range(FIRST_ISSUE, FIRST_ISSUE + n), nums.tolist()))
+
+# =====================================================
+# MOCK FEED (ACCELERATED CLOCK + FAULTS)
+# =====================================================
+
+class MockApi:
+
+    # draws: (issue, number) pairs, oldest first. The first `backlog` are
+    # visible from start(); each later one is released period/speed
+    # seconds after the one before it. speed=0 stops the clock with every
+    # draw visible.
+    #
+    # Fault rates are per request and drawn from a generator seeded with
+    # (seed, request number), so a run with the same requests in the same
+    # order meets the same faults.
+
+    def __init__(self, draws, backlog=None, period=PERIOD, speed=1, seed=0,
+                 latency=(0, 0), hang=HANG, timeout_rate=0, empty_rate=0, malformed_rate=0):
+
+        self.draws = draws
+        self.backlog = len(draws) if backlog is None or not speed else backlog
+        self.period = period
+        self.speed = speed
+        self.seed = seed
+
+        self.latency = latency          # (min, max) seconds added to every reply
+        self.hang = hang
+        self.timeout_rate = timeout_rate
+        self.empty_rate = empty_rate
+        self.malformed_rate = malformed_rate
+
+        self.lock = threading.Lock()
+        self.t0 = time.monotonic()
+        self.requests = 0
+        self.faults = {"timeout": 0, "empty": 0, "malformed": 0}
+
+    def start(self):
+        self.t0 = time.monotonic()
+
+    def step(self):
+        return self.period / self.speed if self.speed else 0
+
+    def visible(self):
+
+        if not self.speed:
+            return len(self.draws)
+
+        live = int((time.monotonic() - self.t0) / self.step())
+        return min(len(self.draws), self.backlog + live)
+
+    def released_at(self, issue):
+
+        # Monotonic time the issue first showed up in replies
+        k = int(issue) - self.draws[0][0]
+        return self.t0 + max(0, k - self.backlog + 1) * self.step()
+
+    def page(self, size, page):
+
+        # Newest first, like the real /api/get_history
+        hi = self.visible() - (page - 1) * size
+        lo = max(0, hi - size)
+        rows = self.draws[lo:hi] if hi > 0 else []
+        return [{"issueNumber": str(i), "number": str(n)} for i, n in reversed(rows)]
+
+    def fault(self):
+
+        with self.lock:
+            self.requests += 1
+            rnd = random.Random(self.seed * 1000003 + self.requests)
+
+        delay = rnd.uniform(*self.latency) if self.latency[1] else 0
+
+        x = rnd.random()
+        for kind, rate in (("timeout", self.timeout_rate),
+                           ("empty", self.empty_rate),
+                           ("malformed", self.malformed_rate)):
+            if x < rate:
+                with self.lock:
+                    self.faults[kind] += 1
+                return kind, delay, rnd
+            x -= rate
+
+        return None, delay, rnd
+
+    def reply(self, query):
+
+        # (status, body) for one request, after any injected delay
+        kind, delay, rnd = self.fault()
+
+        if kind == "timeout":
+            time.sleep(self.hang)
+        elif delay:
+            time.sleep(delay)
+
+        size = int(query.get("size", ["10"])[0])
+        page = int(query.get("pageNo", ["1"])[0])
+
+        if kind == "empty":
+            rows = []
+        else:
+            rows = self.page(size, page)
+
+        if kind == "malformed":
+            return rnd.choice((
+                (200, b'{"data": {"list": ['),
+                (200, b'{"data": null}'),
+                (200, json.dumps({"data": {"list": [{"issueNumber": r["issueNumber"]} for r in rows]}}).encode()),
+                (502, b"<html><body>Bad Gateway</body></html>")
+            ))
+
+        return 200, json.dumps({"data": {"list": rows}}).encode()
+
+def serve(api, host="127.0.0.1", port=0):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def log_message(self, *a):
+            pass
+
+        def do_GET(self):
+
+            url = urlparse(self.path)
+
+            if url.path != API_PATH:
+                status, body = 404, b"not found"
+            else:
+                status, body = api.reply(parse_qs(url.query))
+
+            try:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except OSError:
+                # The client gave up on an injected timeout
+                pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server, f"http://{host}:{server.server_port}{API_PATH}"
+
+# =====================================================
+# HARNESS (REAL PIPELINE AGAINST THE MOCK)
+# =====================================================
+
+class Harness:
+
+    # Runs the real PerfectXAI poll loop against a MockApi whose clock runs
+    # `api.speed` times faster, with app's poll timings scaled to match.
+    # Latency is from an issue's release to the on_draw that handles it.
+
+    def __init__(self, api):
+        self.api = api
+
+    def run(self):
+
+        import app
+
+        api = self.api
+
+        if not api.speed:
+            raise ValueError("the harness needs a running clock (speed > 0)")
+
+        saved = {k: getattr(app, k) for k in SCALED}
+        for k in SCALED:
+            setattr(app, k, saved[k] / api.speed)
+
+        server, url = serve(api)
+
+        try:
+            bot = app.PerfectXAI(url=url, log=lambda *a: None)
+
+            latency = []
+            counts = {"ingested": 0, "backfilled": 0, "voided": 0, "startup_errors": 0}
+
+            on_draw, backfill, ingest, void = bot.on_draw, bot.backfill, bot.ingest, bot.void
+
+            def timed_on_draw(cid, num):
+                out = on_draw(cid, num)
+                latency.append(time.monotonic() - api.released_at(cid))
+                return out
+
+            def counted_backfill(cid):
+                before = counts["ingested"]
+                backfill(cid)
+                counts["backfilled"] += counts["ingested"] - before
+
+            def counted_ingest(cid, num):
+                counts["ingested"] += 1
+                ingest(cid, num)
+
+            def counted_void():
+                if bot.active_pred and bot.active_pred != "SKIP":
+                    counts["voided"] += 1
+                void()
+
+            bot.on_draw = timed_on_draw
+            bot.backfill = counted_backfill
+            bot.ingest = counted_ingest
+            bot.void = counted_void
+
+            api.start()
+            t = time.monotonic()
+
+            # Retried like Engine.step does, with failures counted, not raised
+            while True:
+                try:
+                    if bot.prepare():
+                        break
+                except Exception:
+                    counts["startup_errors"] += 1
+                time.sleep(app.BACKOFF_MAX)
+
+            ready = time.monotonic() - t
+
+            last = str(api.draws[-1][0])
+            end = api.released_at(last) + 3 * api.step() + api.hang
+
+            while bot.last_id != last and time.monotonic() < end:
+                time.sleep(bot.poll())
+
+            took = time.monotonic() - t
+
+        finally:
+            server.shutdown()
+            for k, v in saved.items():
+                setattr(app, k, v)
+
+        # Released issues that made it into the history, by whichever path:
+        # the first sync, a backfill or on_draw
+        h = bot.dm.history
+        have = set(h.ids.tolist())
+        released = [i for i, _ in api.draws[api.backlog:] if i >= h.ids[0]]
+        handled = sum(1 for i in released if i in have)
+        lat = sorted(latency)
+
+        def pct(p):
+            return round(lat[min(len(lat) - 1, int(p * len(lat)))] * 1000, 1) if lat else None
+
+        return {
+            "speed": api.speed,
+            "released": len(released),
+            "handled": handled,
+            "missed": len(released) - handled,
+            "backfilled": counts["backfilled"],
+            "voided": counts["voided"],
+            "requests": api.requests,
+            "requests_per_issue": round(api.requests / len(released), 2) if released else 0,
+            "faults": dict(api.faults),
+            "startup_errors": counts["startup_errors"],
+            "ready_ms": round(ready * 1000, 1),
+            "latency_ms": {"p50": pct(0.5), "p95": pct(0.95), "max": pct(1.0)},
+            "issues_per_sec": round(handled / took, 2) if took else 0,
+            "wins": bot.state["wins"],
+            "losses": bot.state["losses"],
+            "seconds": round(took, 3)
+        }
+
+# =====================================================
+# CLI
+# =====================================================
+
+def fault_args(ap):
+
+    ap.add_argument("source", nargs="?", help="recorded draws (.db / JSON / JSON-lines); synthetic when omitted")
+    ap.add_argument("--draws", type=int, default=1200, help="synthetic draws to generate")
+    ap.add_argument("--backlog", type=int, default=1000, help="draws visible at start; the rest are released live")
+    ap.add_argument("--period", type=float, default=PERIOD, help="seconds per issue at 1x")
+    ap.add_argument("--speed", type=float, default=100, help="clock speed-up (0 = frozen, everything visible)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--latency", default="0:0", help="min:max seconds added to each reply")
+    ap.add_argument("--hang", type=float, default=HANG, help="seconds an injected timeout holds the request")
+    ap.add_argument("--timeouts", type=float, default=0, help="fraction of requests that hang")
+    ap.add_argument("--empty", type=float, default=0, help="fraction of requests answered with an empty list")
+    ap.add_argument("--malformed", type=float, default=0, help="fraction of requests answered with a broken payload")
+
+def build(args):
+
+    if args.source:
+        from backtest import load_draws
+        draws = load_draws(args.source)
+    else:
+        draws = synthetic(args.draws, args.seed)
+
+    lo, hi = (float(x) for x in args.latency.split(":"))
+
+    return MockApi(
+        draws, min(args.backlog, len(draws)), args.period, args.speed, args.seed,
+        (lo, hi), args.hang, args.timeouts, args.empty, args.malformed
+    )
+
+if __name__=="__main__":
+
+    ap = argparse.ArgumentParser(description="Stand-in wingo history API and a load / fault harness")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    sp = sub.add_parser("serve", help="serve the mock API until interrupted")
+    fault_args(sp)
+    sp.add_argument("--host", default="127.0.0.1")
+    sp.add_argument("--port", type=int, default=8000)
+
+    hp = sub.add_parser("harness", help="run Perfect X AI against the mock and report")
+    fault_args(hp)
+    hp.add_argument("--json", action="store_true", help="print the full result as JSON")
+
+    args = ap.parse_args()
+    api = build(args)
+
+    if args.cmd == "serve":
+        server, url = serve(api, args.host, args.port)
+        api.start()
+        print(f"MOCK API AT {url}  ({len(api.draws)} draws, {api.backlog} visible, {args.speed}x)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.shutdown()
+        sys.exit(0)
+
+    stats = Harness(api).run()
+
+    if args.json:
+        json.dump(stats, sys.stdout, indent=2)
+        print()
+        sys.exit(0)
+
+    lat = stats["latency_ms"]
+    print("===================================================")
+    print(f" ISSUES     : {stats['handled']} / {stats['released']} handled at {stats['speed']}x"
+          f"  ({stats['issues_per_sec']}/s)")
+    print(f" BACKFILLED : {stats['backfilled']}   VOIDED : {stats['voided']}   MISSED : {stats['missed']}")
+    print(f" LATENCY    : p50 {lat['p50']} ms  p95 {lat['p95']} ms  max {lat['max']} ms")
+    print(f" REQUESTS   : {stats['requests']}  ({stats['requests_per_issue']}/issue)  FAULTS : {stats['faults']}")
+    print(f" READY      : {stats['ready_ms']} ms ({stats['startup_errors']} startup errors)   WIN / LOSS : {stats['wins']} / {stats['losses']}")
+    print("===================================================")
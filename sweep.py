@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import csv
+import random
+import argparse
+import itertools
+import numpy as np
+from multiprocessing import Pool, shared_memory
+import app
+from backtest import Replay, load_draws
+
+# =====================================================
+# SEARCH SPACE
+# =====================================================
+
+# Module constants in app.py a sweep may override
+SWEEP_KEYS = (
+    "BASE_CONF", "CONF_STEP",
+    "AI_WEIGHT", "AI_WEIGHT_MIN", "AI_WEIGHT_MAX", "AI_WEIGHT_STEP",
+    "GB_ESTIMATORS", "GB_LEARNING_RATE", "GB_MAX_DEPTH",
+    "GB_GROW_TREES", "GB_MAX_TREES",
+    "TRAIN_SIZE", "RETRAIN_EVERY"
+)
+
+def parse_value(key, v):
+    return type(getattr(app, key))(v)
+
+def parse_space(specs):
+
+    # NAME=a,b,c  -> pick from the listed values
+    # NAME=lo:hi  -> uniform range (random search only)
+    space = {}
+
+    for spec in specs:
+
+        key, _, vals = spec.partition("=")
+        key = key.strip().upper()
+
+        if key not in SWEEP_KEYS:
+            raise SystemExit(f"unknown parameter {key}, choose from: {', '.join(SWEEP_KEYS)}")
+
+        if ":" in vals:
+            lo, hi = vals.split(":")
+            space[key] = (parse_value(key, lo), parse_value(key, hi))
+        else:
+            space[key] = [parse_value(key, v) for v in vals.split(",")]
+
+    return space
+
+def grid(space):
+
+    if any(isinstance(v, tuple) for v in space.values()):
+        raise SystemExit("lo:hi ranges need --samples (random search)")
+
+    keys = list(space)
+    for combo in itertools.product(*(space[k] for k in keys)):
+        yield dict(zip(keys, combo))
+
+def sample(space, n, seed):
+
+    rnd = random.Random(seed)
+
+    for _ in range(n):
+        cfg = {}
+        for k, v in space.items():
+            if isinstance(v, list):
+                cfg[k] = rnd.choice(v)
+            elif isinstance(v[0], int):
+                cfg[k] = rnd.randint(v[0], v[1])
+            else:
+                cfg[k] = round(rnd.uniform(v[0], v[1]), 4)
+        yield cfg
+
+# =====================================================
+# WORKERS (HISTORY SHARED ONCE, NOT PICKLED PER TASK)
+# =====================================================
+
+_DRAWS = None
+_WARMUP = None
+_DEFAULTS = None
+
+def _attach(name, n, warmup):
+
+    global _DRAWS, _WARMUP, _DEFAULTS
+
+    _DEFAULTS = {k: getattr(app, k) for k in SWEEP_KEYS}
+
+    shm = shared_memory.SharedMemory(name=name)
+    buf = np.ndarray((2, n), dtype=np.int64, buffer=shm.buf)
+    _DRAWS = list(zip(buf[0].tolist(), buf[1].tolist()))
+    _WARMUP = warmup
+    shm.close()
+
+def _evaluate(cfg):
+
+    # Pool workers are reused across tasks: put back the defaults before
+    # applying this config, so no override leaks into the next evaluation
+    for k, v in dict(_DEFAULTS, **cfg).items():
+        setattr(app, k, v)
+
+    stats = Replay(_DRAWS, _WARMUP).run()
+
+    row = dict(cfg)
+    row.update({
+        "hit_rate": round(stats["hit_rate"], 4),
+        "skip_rate": round(stats["skip_rate"], 4),
+        "max_loss_streak": stats["max_loss_streak"],
+        "wins": stats["wins"],
+        "losses": stats["losses"],
+        "seconds": stats["seconds"]
+    })
+    return row
+
+# =====================================================
+# CLI
+# =====================================================
+
+if __name__=="__main__":
+
+    ap = argparse.ArgumentParser(description="Sweep Perfect X AI settings over recorded draws")
+    ap.add_argument("source", help="history .db file, or JSON / JSON-lines of API records")
+    ap.add_argument("-p", "--param", action="append", default=[], metavar="NAME=SPEC",
+                    help="a,b,c for listed values or lo:hi for a range; repeatable")
+    ap.add_argument("--samples", type=int, help="random search with this many configs instead of a grid")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    ap.add_argument("--warmup", type=int, default=app.SYNC_PAGES * app.SYNC_PAGE_SIZE)
+    ap.add_argument("--out", default="sweep_results.csv")
+    args = ap.parse_args()
+
+    space = parse_space(args.param)
+    configs = list(sample(space, args.samples, args.seed) if args.samples else grid(space))
+
+    draws = load_draws(args.source)
+    n = len(draws)
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, 2 * n * 8))
+
+    try:
+        buf = np.ndarray((2, n), dtype=np.int64, buffer=shm.buf)
+        buf[0] = [d[0] for d in draws]
+        buf[1] = [d[1] for d in draws]
+
+        rows = []
+
+        with Pool(args.workers, initializer=_attach, initargs=(shm.name, n, args.warmup)) as pool:
+            for i, row in enumerate(pool.imap_unordered(_evaluate, configs), 1):
+                rows.append(row)
+                print(f"[{i}/{len(configs)}] {row}", file=sys.stderr)
+    finally:
+        shm.close()
+        shm.unlink()
+
+    # Best hit rate first; fewer skips, then shorter loss streaks break ties
+    rows.sort(key=lambda r: (-r["hit_rate"], r["skip_rate"], r["max_loss_streak"]))
+
+    cols = list(space) + ["hit_rate", "skip_rate", "max_loss_streak", "wins", "losses", "seconds"]
+
+    with open(args.out, "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=cols)
+        w.writeheader()
+        w.writerows(rows)
+
+    print("rank  " + "  ".join(cols))
+    for rank, r in enumerate(rows[:10], 1):
+        print(f"{rank:<5} " + "  ".join(str(r[c]) for c in cols))
+    print(f"\nfull table written to {args.out}")
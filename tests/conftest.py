@@ -0,0 +1,24 @@
+import os
+import sys
+import pytest
+
+# The modules under test live at the repository root, not in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def feed():
+
+    # feed(api) serves a MockApi for the test and returns its URL
+    from mock_api import serve
+
+    servers = []
+
+    def start(api):
+        server, url = serve(api)
+        servers.append(server)
+        return url
+
+    yield start
+
+    for server in servers:
+        server.shutdown()
@@ -0,0 +1,69 @@
+import app
+from mock_api import MockApi, synthetic
+
+# PerfectXAI.backfill through a real poll: when issues were missed, the
+# prediction standing for the first of them settles against that issue's
+# own result, or is voided if the feed no longer has it
+
+def draws_with_tail(tail):
+
+    # 1200 draws whose last len(tail) numbers are `tail`
+    draws = synthetic(1200)
+    head = draws[:-len(tail)]
+    return head + [(draws[len(head) + i][0], n) for i, n in enumerate(tail)]
+
+def bot_behind(feed, seen, served, events=None):
+
+    # A bot that has seen `seen` and predicted BIG for the issue after it,
+    # polling a feed that serves `served`
+    bot = app.PerfectXAI(url=feed(MockApi(served, speed=0)), background=False,
+                         log=lambda *a: None, events=events)
+    bot.dm.history.extend(seen)
+    bot.warm_up()
+
+    bot.active_issue = str(seen[-1][0] + 1)
+    bot.active_pred = "BIG"
+    if events:
+        events.decide(bot.active_issue, "BIG", 0.7, 0.6, [], False)
+
+    return bot
+
+def test_active_issue_resolves_against_its_own_result(feed):
+
+    # The predicted issue drew BIG, everything after it SMALL: settling
+    # against any later draw would turn the WIN into a LOSS
+    draws = draws_with_tail([9, 0, 1, 2, 3])
+    issue = draws[-5][0]
+    bot = bot_behind(feed, draws[:-5], draws)
+
+    bot.poll()
+
+    assert list(bot.pub.rows) == [{"period": str(issue)[-4:], "pred": "BIG", "res": "WIN", "seq": 1}]
+    assert (bot.state["wins"], bot.state["losses"]) == (1, 0)
+
+    # Every missed issue went into the history, in order
+    assert bot.dm.history.ids[-5:].tolist() == [i for i, _ in draws[-5:]]
+    assert bot.last_id == str(draws[-1][0])
+
+def test_active_issue_is_voided_when_its_row_is_missing(feed, tmp_path):
+
+    draws = draws_with_tail([9, 0, 1, 2, 3])
+    issue = draws[-5][0]
+    served = [d for d in draws if d[0] != issue]
+    events = app.EventLog(str(tmp_path / "events.log"))
+    bot = bot_behind(feed, draws[:-5], served, events)
+
+    bot.poll()
+
+    # Neither a win nor a loss, and logged as VOID
+    assert len(bot.pub.rows) == 0
+    assert (bot.state["wins"], bot.state["losses"]) == (0, 0)
+
+    rows, _ = app.load_events(events.path)
+    settled = rows[(rows["kind"] == app.EV_RESOLVE) & (rows["issue"] == issue)]
+    assert [app.OUTCOMES[o] for o in settled["outcome"]] == ["VOID"]
+
+    # The issues that did arrive are in the history; the lost one is not
+    ids = bot.dm.history.ids.tolist()
+    assert issue not in ids
+    assert ids[-4:] == [i for i, _ in draws[-4:]]
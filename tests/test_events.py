@@ -0,0 +1,149 @@
+import time
+
+import numpy as np
+import pytest
+import app
+
+# The event log: records written through EventLog come back unchanged
+# from load_events, across file growth and reopening, and event_stats
+# counts them into the right buckets
+
+@pytest.fixture
+def path(tmp_path, monkeypatch):
+
+    # A tiny chunk, so a handful of records already grows the file
+    monkeypatch.setattr(app, "EVENT_CHUNK", 4)
+    return str(tmp_path / "events.log")
+
+def ballot(ai=None, markov=None, pattern=None):
+
+    # (side, conf) per voter; None votes WAIT
+    votes = {"ai": ai, "markov": markov, "pattern": pattern}
+    return [(name, v if v else ("WAIT", 0)) for name, v in votes.items()]
+
+def play(log, issue, pred, conf, result, outcome, votes=(), anomaly=None):
+    log.decide(str(issue), pred, conf, 0.6, ballot(*votes), anomaly)
+    log.resolve(str(issue), result, outcome)
+
+def test_records_round_trip(path):
+
+    log = app.EventLog(path)
+    play(log, 101, "BIG", 0.71, "BIG", "WIN", [("BIG", 0.8), ("SMALL", 0.55), None])
+    play(log, 102, "SKIP", 0.40, "SMALL", "SKIP", [None, ("SMALL", 0.6), ("BIG", 0.52)])
+    play(log, 103, "SKIP", 0, "BIG", "SKIP", anomaly="RUN3@20")
+    play(log, 104, "SMALL", 0.66, None, "VOID", [("SMALL", 0.7), None, None])
+
+    rows, voters = app.load_events(path)
+
+    assert voters == ["ai", "markov", "pattern"]
+    assert len(rows) == 8
+    assert rows["issue"].tolist() == [101, 101, 102, 102, 103, 103, 104, 104]
+    assert rows["kind"].tolist() == [app.EV_DECIDE, app.EV_RESOLVE] * 4
+
+    # A resolution repeats its decision and adds the result
+    res = rows[rows["kind"] == app.EV_RESOLVE]
+    assert res["pred"].tolist() == [1, -1, -1, 0]
+    assert res["result"].tolist() == [1, 0, 1, -1]
+    assert [app.OUTCOMES[o] for o in res["outcome"]] == ["WIN", "SKIP", "SKIP", "VOID"]
+    assert res["anomaly"].tolist() == [0, 0, 1, 0]
+    assert np.allclose(res["conf"], [0.71, 0.40, 0, 0.66])
+    assert np.allclose(res["required"], 0.6)
+    assert res["sides"][:, :3].tolist() == [[1, 0, -1], [-1, 0, 1], [-1, -1, -1], [0, -1, -1]]
+    assert np.allclose(res["confs"][:, :3], [[0.8, 0.55, 0], [0, 0.6, 0.52], [0, 0, 0], [0.7, 0, 0]])
+    assert (res["sides"][:, 3:] == -1).all()
+
+    # Written in order, decided before resolved
+    assert (np.diff(rows["ts"]) >= 0).all()
+    assert (res["decided"] <= res["ts"]).all()
+
+def test_reopened_log_appends_after_the_last_record(path):
+
+    log = app.EventLog(path)
+    for i in range(10):
+        play(log, 200 + i, "BIG", 0.7, "BIG", "WIN")
+    del log
+
+    log = app.EventLog(path)
+    assert log.count == 20
+    play(log, 300, "SMALL", 0.7, "BIG", "LOSS")
+
+    rows, _ = app.load_events(path)
+    assert len(rows) == 22
+    assert rows["issue"][-1] == 300
+    assert rows["issue"][:20:2].tolist() == list(range(200, 210))
+
+def test_missing_and_empty_logs_read_as_empty(path):
+
+    rows, voters = app.load_events(path)
+    assert len(rows) == 0 and voters == ["ai", "markov", "pattern"]
+
+    app.EventLog(path)
+    rows, _ = app.load_events(path)
+    assert len(rows) == 0
+
+    for by in ("hour", "conf", "voter"):
+        assert all(r["predictions"] == 0 for r in app.event_stats(rows, voters, by))
+
+def test_stats_by_conf(path):
+
+    log = app.EventLog(path)
+    play(log, 1, "BIG", 0.52, "BIG", "WIN")
+    play(log, 2, "BIG", 0.53, "SMALL", "LOSS")
+    play(log, 3, "SMALL", 0.61, "SMALL", "WIN")
+    play(log, 4, "BIG", 0.64, "BIG", "WIN")
+    play(log, 5, "BIG", 0.97, "SMALL", "LOSS")
+    # Neither counts as a settled prediction
+    play(log, 6, "SKIP", 0.58, "BIG", "SKIP")
+    play(log, 7, "BIG", 0.58, None, "VOID")
+
+    rows, voters = app.load_events(path)
+    stats = {r["bucket"]: r for r in app.event_stats(rows, voters, "conf")}
+
+    assert len(stats) == 10
+    assert (stats["0.50-0.55"]["predictions"], stats["0.50-0.55"]["wins"]) == (2, 1)
+    assert stats["0.50-0.55"]["hit_rate"] == 0.5
+    assert (stats["0.60-0.65"]["predictions"], stats["0.60-0.65"]["wins"]) == (2, 2)
+    assert (stats["0.95-1.00"]["predictions"], stats["0.95-1.00"]["wins"]) == (1, 0)
+    assert stats["0.55-0.60"]["predictions"] == 0 and stats["0.55-0.60"]["hit_rate"] is None
+    assert sum(r["predictions"] for r in stats.values()) == 5
+
+def test_stats_by_voter(path):
+
+    # Every resolved issue a voter took a side on counts, skips included;
+    # voids have no result to check against
+    log = app.EventLog(path)
+    play(log, 1, "BIG", 0.7, "BIG", "WIN", [("BIG", 0.8), ("SMALL", 0.6), None])
+    play(log, 2, "SKIP", 0.5, "SMALL", "SKIP", [("SMALL", 0.6), ("SMALL", 0.6), ("BIG", 0.6)])
+    play(log, 3, "BIG", 0.7, None, "VOID", [("BIG", 0.9), ("BIG", 0.9), ("BIG", 0.9)])
+
+    rows, voters = app.load_events(path)
+    stats = {r["bucket"]: (r["predictions"], r["wins"]) for r in app.event_stats(rows, voters, "voter")}
+
+    assert stats == {"ai": (2, 2), "markov": (2, 1), "pattern": (1, 0)}
+
+def test_stats_by_hour_and_time_range(path):
+
+    log = app.EventLog(path)
+    for i in range(6):
+        play(log, i, "BIG", 0.7, "BIG" if i % 2 else "SMALL", "WIN" if i % 2 else "LOSS")
+
+    rows, voters = app.load_events(path)
+    hours = app.event_stats(rows, voters, "hour")
+
+    # Bucketed by decision time, even if the clock ticks over mid-test
+    res = rows[rows["kind"] == app.EV_RESOLVE]
+    want = [0] * 24
+    for d in res["decided"]:
+        want[int(d // 3600 % 24)] += 1
+    assert [r["bucket"] for r in hours] == list(range(24))
+    assert [r["predictions"] for r in hours] == want
+    assert sum(r["wins"] for r in hours) == 3
+
+    # since / until bound the resolution time
+    later = time.time() + 60
+    assert sum(r["predictions"] for r in app.event_stats(rows, voters, "hour", since=later)) == 0
+    assert sum(r["predictions"] for r in app.event_stats(rows, voters, "hour", until=later)) == 6
+    assert sum(r["predictions"] for r in app.event_stats(rows, voters, "hour", until=rows["ts"][0])) == 0
+
+    with pytest.raises(ValueError):
+        app.event_stats(rows, voters, "day")
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+import app
+
+# AiCore.features must build exactly the rows the per-row extract() does,
+# for any history length and however far the ring buffer has wrapped
+
+def history(n, capacity, seed):
+
+    rng = np.random.default_rng(seed)
+    h = app.DrawBuffer(capacity)
+    h.extend(zip(range(1000, 1000 + n), rng.integers(0, 10, n).tolist()))
+    return h
+
+def reference(ai, h, start, stop):
+    return np.array([ai.extract(h, i) for i in range(start, stop)], dtype=np.int64).reshape(-1, 8)
+
+@pytest.mark.parametrize("n", [0, 1, 5, 9, 10, 11, 12, 50, 300])
+@pytest.mark.parametrize("capacity", [50, 200])
+def test_features_match_extract(n, capacity):
+
+    ai = app.AiCore()
+
+    for seed in range(3):
+        h = history(n, capacity, seed)
+        size = len(h)
+
+        for start, stop in [(10, size), (0, size), (size // 2, size), (size, size)]:
+            X = ai.features(h, start, stop)
+            assert X.shape == (max(0, stop - start), 8)
+            assert np.array_equal(X, reference(ai, h, start, stop))
+
+def test_features_random_ranges():
+
+    ai = app.AiCore()
+    rng = np.random.default_rng(7)
+
+    for seed in range(20):
+        h = history(int(rng.integers(0, 600)), int(rng.integers(20, 300)), seed)
+        for _ in range(5):
+            start = int(rng.integers(0, len(h) + 1))
+            stop = int(rng.integers(start, len(h) + 1))
+            assert np.array_equal(ai.features(h, start, stop), reference(ai, h, start, stop))
+
+def test_features_long_runs():
+
+    # Streaks longer than the 9-draw cap, across the wrap point
+    ai = app.AiCore()
+    h = app.DrawBuffer(40)
+    h.extend((1000 + i, 9 if (i // 13) % 2 else 1) for i in range(95))
+
+    assert np.array_equal(ai.features(h, 0, len(h)), reference(ai, h, 0, len(h)))
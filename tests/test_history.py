@@ -0,0 +1,82 @@
+import pytest
+import app
+
+# /api/history paging: since= walks forward from the oldest missed row,
+# before= walks back, and neither is the newest page, whether the rows
+# are still in the Publisher's deque or only in the store
+
+@pytest.fixture
+def publisher(tmp_path, monkeypatch):
+
+    # Keep 10 rows in memory, 30 in the store
+    monkeypatch.setattr(app, "HISTORY_ROWS", 10)
+    store = app.HistoryStore(str(tmp_path / "h.db"))
+    pub = app.Publisher(app.new_state(), mirror=store)
+    pub.archive = store
+
+    for i in range(30):
+        pub.add_row({"period": str(i), "pred": "BIG", "res": "WIN"})
+
+    return pub
+
+def seqs(rows):
+    return [r["seq"] for r in rows]
+
+def page_forward(src, since, limit):
+
+    got = []
+
+    while True:
+        rows = src.history(since=since, limit=limit)
+        if not rows:
+            return got
+        got += seqs(rows)
+        since = rows[-1]["seq"]
+
+def test_since_pages_forward_from_the_oldest_row(publisher):
+
+    assert len(publisher.rows) == 10
+    assert seqs(publisher.history(since=25, limit=3)) == [26, 27, 28]
+    assert seqs(publisher.history(since=28, limit=5)) == [29, 30]
+    assert publisher.history(since=30, limit=5) == []
+
+def test_since_falls_back_to_the_archive(publisher):
+
+    # Rows 1..20 have left the deque; a client that far behind still
+    # gets every row, in order, by paging forward
+    assert seqs(publisher.history(since=0, limit=5)) == [1, 2, 3, 4, 5]
+    assert seqs(publisher.history(since=18, limit=5)) == [19, 20, 21, 22, 23]
+    assert page_forward(publisher, 0, 7) == list(range(1, 31))
+
+def test_without_archive_since_starts_at_the_oldest_kept_row(tmp_path, monkeypatch):
+
+    monkeypatch.setattr(app, "HISTORY_ROWS", 10)
+    pub = app.Publisher(app.new_state())
+
+    for i in range(30):
+        pub.add_row({"period": str(i), "pred": "BIG", "res": "WIN"})
+
+    assert seqs(pub.history(since=0, limit=3)) == [21, 22, 23]
+
+def test_newest_page_and_before(publisher):
+
+    assert seqs(publisher.history(limit=4)) == [27, 28, 29, 30]
+    assert seqs(publisher.history(before=25, limit=3)) == [24, 23, 22]
+    assert seqs(publisher.history(before=5, limit=3)) == [4, 3, 2]
+
+def test_follower_pages_the_same_way(publisher):
+
+    follower = app.SharedState(publisher.archive)
+
+    assert seqs(follower.history(since=18, limit=5)) == [19, 20, 21, 22, 23]
+    assert page_forward(follower, 0, 7) == list(range(1, 31))
+    assert seqs(follower.history(limit=4)) == [27, 28, 29, 30]
+    assert seqs(follower.history(before=5, limit=3)) == [4, 3, 2]
+
+def test_route_pages_forward(publisher, monkeypatch):
+
+    monkeypatch.setitem(app.PUBLISHERS, app.DEFAULT_FEED, publisher)
+    client = app.app.test_client()
+
+    body = client.get("/api/history?since=2&limit=3").json
+    assert seqs(body["rows"]) == [3, 4, 5]
@@ -0,0 +1,22 @@
+import app
+
+# What followers serve before and after the leader publishes
+
+def test_follower_stream_before_the_leader_publishes(tmp_path, monkeypatch):
+
+    store = app.HistoryStore(str(tmp_path / "h.db"))
+    monkeypatch.setitem(app.PUBLISHERS, app.DEFAULT_FEED, app.SharedState(store))
+    monkeypatch.setattr(app, "SHARED_POLL", 0)
+
+    # A reconnect carrying an id from before a restart
+    client = app.app.test_client()
+    frames = iter(client.get("/api/events", headers={"Last-Event-ID": "7"}).response)
+
+    assert next(frames).startswith(b"id: 0\ndata: {")
+
+    leader = app.Publisher(app.new_state(), mirror=store)
+    leader.state["wins"] = 3
+    leader.publish()
+
+    assert next(frames).startswith(b"id: 1\ndata: {")
+    assert client.get("/api/state").json["wins"] == 3
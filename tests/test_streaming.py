@@ -0,0 +1,237 @@
+from collections import Counter, defaultdict
+
+import numpy as np
+import pytest
+import app
+
+# The streaming models (trained once, then fed update/evict per draw the way
+# PerfectXAI.ingest does) against the full-rescan implementations they
+# replaced, over random draws in buffers that fill up and wrap
+
+# =====================================================
+# REFERENCES (THE ORIGINAL FULL-RESCAN MODELS)
+# =====================================================
+
+class BaselineMarkov:
+
+    def __init__(self):
+        self.chain = defaultdict(lambda: {"BIG": 0, "SMALL": 0})
+
+    def train(self, h):
+
+        self.chain.clear()
+
+        for i in range(3, len(h)):
+            k = (h[i-3]["res"], h[i-2]["res"], h[i-1]["res"])
+            self.chain[k][h[i]["res"]] += 1
+
+    def predict(self, h):
+
+        if len(h) < 3:
+            return "WAIT", 0
+
+        k = (h[-3]["res"], h[-2]["res"], h[-1]["res"])
+
+        stats = self.chain.get(k, {"BIG": 0, "SMALL": 0})
+        total = stats["BIG"] + stats["SMALL"]
+
+        if total < 4:
+            return "WAIT", 0
+
+        p = stats["BIG"] / total
+
+        if p > 0.5:
+            return "BIG", p
+        elif p < 0.5:
+            return "SMALL", 1-p
+
+        return "WAIT", 0
+
+def backoff_markov(h, order=app.MARKOV_ORDER):
+
+    # The multi-order chain MarkovCore keeps, recounted from scratch
+    s = [x["res"] for x in h]
+
+    for o in range(min(order, len(s)), 0, -1):
+
+        ctx = tuple(s[-o:])
+        nxt = Counter(s[i+o] for i in range(len(s) - o) if tuple(s[i:i+o]) == ctx)
+        total = nxt["BIG"] + nxt["SMALL"]
+
+        if total < app.MARKOV_MIN_OBS:
+            continue
+
+        p = nxt["BIG"] / total
+
+        if p > 0.5:
+            return "BIG", p
+        elif p < 0.5:
+            return "SMALL", 1-p
+
+        return "WAIT", 0
+
+    return "WAIT", 0
+
+class BaselineDeepPattern:
+
+    def predict(self, h):
+
+        if len(h) < 20:
+            return "WAIT", 0
+
+        s = "".join("B" if x["res"] == "BIG" else "S" for x in h)
+
+        best = "WAIT"
+        best_conf = 0
+
+        for depth in range(6, 2, -1):
+
+            cur = s[-depth:]
+            matches = []
+
+            for i in range(len(s)-depth):
+                if s[i:i+depth] == cur and i+depth < len(s):
+                    matches.append(s[i+depth])
+
+            if len(matches) >= 3:
+                c = Counter(matches)
+                top = c.most_common(1)[0]
+                conf = top[1] / len(matches)
+
+                if conf > best_conf:
+                    best_conf = conf
+                    best = "BIG" if top[0] == "B" else "SMALL"
+
+        return best, best_conf
+
+class BaselineAnomaly:
+
+    def check(self, h):
+
+        if len(h) < 20:
+            return False
+
+        # h[-20:], which DrawBuffer does not slice
+        nums = [h[i]["n"] for i in range(len(h) - 20, len(h))]
+
+        for i in range(len(nums)-2):
+            if nums[i] == nums[i+1] == nums[i+2]:
+                return True
+
+        c = Counter(nums)
+
+        if c.most_common(1)[0][1] > 6:
+            return True
+
+        return False
+
+def anomaly_rules(h, rules):
+
+    # First rule that fires on the last w draws, checked from scratch
+    nums = [h[i]["n"] for i in range(len(h))]
+
+    for w, r, c in rules:
+
+        if len(nums) < w:
+            continue
+
+        win = nums[-w:]
+        run = 1
+        for i in range(1, len(win)):
+            run = run + 1 if win[i] == win[i-1] else 1
+            if run >= r:
+                return f"RUN{r}@{w}"
+
+        if max(Counter(win).values()) > c:
+            return f"COUNT>{c}@{w}"
+
+    return None
+
+# =====================================================
+# DRIVER
+# =====================================================
+
+def stream(capacity, n, seed, models, trained_at):
+
+    # Yields the buffer after each draw; models are trained on the first
+    # `trained_at` draws and streamed from there, as after warm_up()
+    rng = np.random.default_rng(seed)
+    # A low-entropy mix so long runs and repeated digits actually occur
+    nums = np.where(rng.random(n) < 0.3, rng.integers(0, 3, n), rng.integers(0, 10, n)).tolist()
+    h = app.DrawBuffer(capacity)
+
+    for i, num in enumerate(nums):
+
+        if i < trained_at:
+            h.append(1000 + i, num)
+            if i == trained_at - 1:
+                for m in models:
+                    m.train(h)
+            continue
+
+        if h.full():
+            for m in models:
+                m.evict(h)
+        h.append(1000 + i, num)
+        for m in models:
+            m.update(h)
+
+        yield h
+
+CASES = [(50, 0), (50, 1), (200, 2), (200, 3)]
+
+def close(a, b):
+    return a[0] == b[0] and abs(a[1] - b[1]) < 1e-12
+
+# =====================================================
+# TESTS
+# =====================================================
+
+@pytest.mark.parametrize("capacity,seed", CASES)
+def test_markov_matches_rescan(capacity, seed):
+
+    mk = app.MarkovCore()
+    base = BaselineMarkov()
+
+    for h in stream(capacity, 3 * capacity, seed, [mk], trained_at=10):
+
+        got = mk.predict(h)
+        assert close(got, backoff_markov(h))
+
+        # Wherever the 3-draw context has enough observations, backoff
+        # never kicks in and the original chain agrees
+        base.train(h)
+        want = base.predict(h)
+        if want[0] != "WAIT":
+            assert close(got, want)
+
+    fresh = app.MarkovCore()
+    fresh.train(h)
+    assert fresh.counts == mk.counts
+
+@pytest.mark.parametrize("capacity,seed", CASES)
+def test_deep_pattern_matches_string_scan(capacity, seed):
+
+    dp = app.DeepPattern()
+    base = BaselineDeepPattern()
+
+    for h in stream(capacity, 3 * capacity, seed, [dp], trained_at=25):
+        assert close(dp.predict(h), base.predict(h))
+
+@pytest.mark.parametrize("capacity,seed", CASES)
+def test_anomaly_matches_window_scan(capacity, seed):
+
+    an = app.AnomalyDetector()
+    base = BaselineAnomaly()
+
+    for h in stream(capacity, 3 * capacity, seed, [an], trained_at=25):
+        assert bool(an.check(h)) == base.check(h)
+
+@pytest.mark.parametrize("capacity,seed", CASES)
+def test_anomaly_rules_match_window_scan(capacity, seed):
+
+    rules = [(20, 3, 6), (50, 4, 12), (200, 5, 30)]
+    an = app.AnomalyDetector(rules)
+
+    for h in stream(capacity, 3 * capacity, seed, [an], trained_at=25):
+        assert an.check(h) == anomaly_rules(h, rules)
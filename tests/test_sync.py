@@ -0,0 +1,97 @@
+import numpy as np
+import app
+from mock_api import MockApi, synthetic
+
+# DataManager.sync against the mock feed: whatever it stores must be one
+# unbroken run of issues, whatever pages fail or however stale the store is
+
+class FlakyApi(MockApi):
+
+    # fails[page] = how many more requests for that page answer 502
+    def __init__(self, draws, fails):
+        super().__init__(draws, speed=0)
+        self.fails = dict(fails)
+
+    def reply(self, query):
+
+        page = int(query.get("pageNo", ["1"])[0])
+
+        if self.fails.get(page):
+            self.fails[page] -= 1
+            return 502, b"<html><body>Bad Gateway</body></html>"
+
+        return super().reply(query)
+
+def stored(store):
+    return np.array([i for i, _ in store.load(10 ** 6)])
+
+def unbroken(ids):
+    return len(ids) > 0 and bool(np.all(np.diff(ids) == 1))
+
+def test_failed_page_fails_the_sync_before_storing(tmp_path, feed):
+
+    draws = synthetic(3000)
+    store = app.HistoryStore(str(tmp_path / "h.db"))
+    store.append(draws[:2800])
+
+    api = FlakyApi(draws, {3: 10 ** 6})
+    dm = app.DataManager(store, feed(api))
+
+    assert not dm.sync()
+    assert stored(store)[-1] == draws[2799][0]
+
+    # Once the page comes back the sync fills the gap with no hole
+    api.fails = {}
+    assert dm.sync()
+    assert unbroken(stored(store))
+    assert stored(store)[-1] == draws[-1][0]
+    assert unbroken(dm.history.ids)
+
+def test_page_that_fails_once_is_retried(tmp_path, feed):
+
+    draws = synthetic(3000)
+    store = app.HistoryStore(str(tmp_path / "h.db"))
+    store.append(draws[:2800])
+
+    dm = app.DataManager(store, feed(FlakyApi(draws, {3: 1})))
+
+    assert dm.sync()
+    assert unbroken(stored(store))
+    assert stored(store)[-1] == draws[-1][0]
+
+def test_cold_sync_with_a_lost_page_stores_nothing(tmp_path, feed):
+
+    store = app.HistoryStore(str(tmp_path / "h.db"))
+    dm = app.DataManager(store, feed(FlakyApi(synthetic(3000), {5: 10 ** 6})))
+
+    assert not dm.sync()
+    assert store.last_id() is None
+
+def test_stale_store_is_not_spliced_onto_fresh_pages(tmp_path, feed):
+
+    # The pages never get back to the stored range: start over from them
+    draws = synthetic(5000)
+    store = app.HistoryStore(str(tmp_path / "h.db"))
+    store.append(draws[:1500])
+
+    dm = app.DataManager(store, feed(FlakyApi(draws, {})))
+
+    assert dm.sync()
+    assert unbroken(dm.history.ids)
+    assert dm.history.ids[-1] == draws[-1][0]
+    assert unbroken(stored(store))
+    assert stored(store)[0] > draws[1499][0]
+
+def test_store_that_meets_the_pages_is_kept(tmp_path, feed):
+
+    draws = synthetic(2500)
+    store = app.HistoryStore(str(tmp_path / "h.db"))
+    store.append(draws[:2000])
+
+    dm = app.DataManager(store, feed(FlakyApi(draws, {})))
+
+    assert dm.sync()
+    assert unbroken(stored(store))
+    assert stored(store)[0] == draws[0][0]
+    assert len(dm.history) == app.HISTORY_LIMIT
+    assert unbroken(dm.history.ids)
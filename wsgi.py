@@ -0,0 +1,9 @@
+#!/usr/bin/env python3
+
+# gunicorn entry point: every worker imports this, one of them becomes the
+# leader that polls and trains, the others serve the dashboard from the
+# shared store (see app.boot)
+
+from app import app, boot
+
+boot()